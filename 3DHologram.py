@@ -4,6 +4,8 @@ import os
 import sys
 import logging
 
+from hologram_generator import VIDEO_FRAME_SIZE, FrameDeduplicator, HologramEngine
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
@@ -63,10 +65,12 @@ def makeHologram(original,scale=0.5,scaleR=4,distance=0):
     #cv2.waitKey()
     return hologram
 
-def process_video(video):
+def process_video(video, dedup_threshold=0.0):
     """
     Process video file and create hologram effect for each frame.
     Includes robust error handling for corrupted videos.
+    Frames repeating the previous one reuse its hologram (dedup_threshold=0 matches
+    exact repeats only, None composes every frame).
     """
     # Validate video file exists
     if not os.path.exists(video):
@@ -92,33 +96,33 @@ def process_video(video):
     
     logger.info(f"Video properties: {width}x{height}, {fps} FPS")
     
-    # Try to read first valid frame to initialize hologram dimensions
-    holo = None
+    # Share one engine across frames so the hologram layout is only computed once.
+    # Frames are stretched to 640x640 and scaled by 0.5 in a single resample.
+    engine = HologramEngine(frame_size=VIDEO_FRAME_SIZE, aspect='stretch')
+    dedup = FrameDeduplicator(dedup_threshold) if dedup_threshold is not None else None
+    
+    # Try to read first valid frame; it is processed as frame 0 instead of seeking back
+    first_frame = None
     first_frame_attempts = 0
     max_attempts = 100
     
-    while holo is None and first_frame_attempts < max_attempts:
+    while first_frame is None and first_frame_attempts < max_attempts:
         ret, frame = cap.read()
         first_frame_attempts += 1
         
         if ret and frame is not None:
-            try:
-                frame = cv2.resize(frame, (640, 640), interpolation=cv2.INTER_CUBIC)
-                holo = makeHologram(frame)
-                logger.info(f"Successfully read first frame after {first_frame_attempts} attempts")
-            except Exception as e:
-                logger.warning(f"Error processing frame {first_frame_attempts}: {e}")
-                continue
+            first_frame = frame
+            logger.info(f"Successfully read first frame after {first_frame_attempts} attempts")
         elif not ret:
             logger.warning(f"Failed to read frame {first_frame_attempts}")
     
-    if holo is None:
+    if first_frame is None:
         logger.error("Could not read any valid frames from video")
         cap.release()
         return False
     
-    # Reset video to beginning for full processing
-    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    # Hologram dimensions follow from the layout, so nothing is composed to learn them
+    holo = engine.new_canvas(first_frame.shape)
     
     # Define codec and create VideoWriter
     # Try multiple codecs for better compatibility
@@ -151,7 +155,7 @@ def process_video(video):
         return False
     
     # Process video frames
-    count = 0
+    count = first_frame_attempts - 1
     skipped = 0
     processed = 0
     
@@ -163,7 +167,10 @@ def process_video(video):
     logger.info(f"Starting video processing... Total frames: {total_frames}")
     
     while True:
-        ret, frame = cap.read()
+        if first_frame is not None:
+            ret, frame, first_frame = True, first_frame, None
+        else:
+            ret, frame = cap.read()
         count += 1
         
         if not ret or frame is None:
@@ -173,9 +180,10 @@ def process_video(video):
             break
         
         try:
-            # Resize and process frame
-            frame = cv2.resize(frame, (640, 640), interpolation=cv2.INTER_CUBIC)
-            holo = makeHologram(frame)
+            # Process frame, composing into the same canvas every time;
+            # a repeated frame leaves the previous hologram in place
+            if dedup is None or not dedup.is_duplicate(frame):
+                engine.compose(frame, out=holo)
             out.write(holo)
             processed += 1
             
@@ -207,6 +215,8 @@ def process_video(video):
     logger.info(f"Output file: {output_file}")
     logger.info(f"Frames processed: {processed}")
     logger.info(f"Frames skipped: {skipped}")
+    if dedup is not None:
+        logger.info(f"Duplicate frames reused: {dedup.hits} ({dedup.hit_rate:.1%})")
     logger.info(f"{'='*50}\n")
     
     return True
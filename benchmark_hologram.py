@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Hologram Generator Benchmarks
+Micro-benchmarks for the hologram_generator hot paths, reported per resolution
+
+Usage:
+    python benchmark_hologram.py [--suite rotation] [--repeat 20]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from hologram_generator import (
+    COMPOSE_MODES, VIDEO_FRAME_SIZE, FFmpegSettings, FFmpegWriter, HologramEngine, _rotation_matrix,
+    load_remap_maps, process_video_hologram, rotate_bound
+)
+
+RESOLUTIONS: Dict[str, Tuple[int, int]] = {
+    '480p': (640, 480),
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160)
+}
+
+
+def _time_call(func: Callable[[], object], repeat: int) -> float:
+    """Best-of-repeat wall time of func in milliseconds"""
+    func()  # Warm up caches and lazy OpenCV initialization
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _random_frame(width: int, height: int) -> np.ndarray:
+    """Deterministic noise frame of the given size"""
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def bench_rotation(repeat: int) -> List[str]:
+    """Quarter-turn fast path of rotate_bound vs the warpAffine path"""
+    rows = [f"{'resolution':<10} {'angle':>5} {'warpAffine ms':>14} {'quarter ms':>11} {'speedup':>8}"]
+    for name, (width, height) in RESOLUTIONS.items():
+        image = _random_frame(width, height)
+        for angle in (90, 180, 270):
+            M, size = _rotation_matrix(height, width, angle)
+            warp_ms = _time_call(lambda: cv2.warpAffine(image, M, size), repeat)
+            quarter_ms = _time_call(lambda: rotate_bound(image, angle), repeat)
+            rows.append(f"{name:<10} {angle:>5} {warp_ms:>14.2f} {quarter_ms:>11.2f} "
+                        f"{warp_ms / quarter_ms:>7.1f}x")
+    return rows
+
+
+def _peak_allocation(func: Callable[[], object]) -> int:
+    """Peak bytes allocated (as seen by tracemalloc) during one call of func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_compose(repeat: int) -> List[str]:
+    """HologramEngine.compose allocating a new canvas vs writing into out="""
+    rows = [f"{'resolution':<10} {'alloc ms':>9} {'alloc bytes':>12} {'out= ms':>8} {'out= bytes':>11}"]
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = _random_frame(width, height)
+        engine = HologramEngine()
+        canvas = engine.new_canvas(frame.shape)
+        alloc_ms = _time_call(lambda: engine.compose(frame), repeat)
+        out_ms = _time_call(lambda: engine.compose(frame, out=canvas), repeat)
+        alloc_bytes = _peak_allocation(lambda: engine.compose(frame))
+        out_bytes = _peak_allocation(lambda: engine.compose(frame, out=canvas))
+        rows.append(f"{name:<10} {alloc_ms:>9.2f} {alloc_bytes:>12} {out_ms:>8.2f} {out_bytes:>11}")
+    return rows
+
+
+def bench_batch(repeat: int, batch_size: int = 8) -> List[str]:
+    """Per-frame compose(out=) calls vs one compose_batch call, both on the same engine"""
+    rows = [f"{'resolution':<10} {'batch':>5} {'per-call fps':>13} {'batch fps':>10}"]
+    for name, (width, height) in RESOLUTIONS.items():
+        frames = np.stack([_random_frame(width, height)] * batch_size)
+        engine = HologramEngine()
+        canvas = engine.new_canvas(frames.shape[1:])
+        canvases = np.zeros((batch_size,) + canvas.shape, frames.dtype)
+        per_call_ms = _time_call(lambda: [engine.compose(frame, out=canvas) for frame in frames], repeat)
+        batch_ms = _time_call(lambda: engine.compose_batch(frames, out=canvases), repeat)
+        rows.append(f"{name:<10} {batch_size:>5} {batch_size * 1000 / per_call_ms:>13.1f} "
+                    f"{batch_size * 1000 / batch_ms:>10.1f}")
+    return rows
+
+
+def bench_remap(repeat: int) -> List[str]:
+    """'views' compositor vs the single-pass 'remap' compositor (maps prebuilt)"""
+    rows = [f"{'resolution':<10} {'views ms':>9} {'remap ms':>9} {'map build ms':>13}"]
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = _random_frame(width, height)
+        timings = []
+        for mode in COMPOSE_MODES:
+            engine = HologramEngine(mode=mode)
+            canvas = engine.new_canvas(frame.shape)
+            timings.append(_time_call(lambda: engine.compose(frame, out=canvas), repeat))
+        plan = HologramEngine().plan_for(frame.shape)
+        build_ms = _time_call(lambda: load_remap_maps(plan), 1)
+        rows.append(f"{name:<10} {timings[0]:>9.2f} {timings[1]:>9.2f} {build_ms:>13.1f}")
+    return rows
+
+
+def bench_video_resize(repeat: int) -> List[str]:
+    """Video frame path: resize to 640x640 then makeHologram vs one fused resample"""
+    rows = [f"{'resolution':<10} {'double resize fps':>18} {'fused fps':>10} {'speedup':>8}"]
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = _random_frame(width, height)
+        double = HologramEngine()
+        fused = HologramEngine(frame_size=VIDEO_FRAME_SIZE, aspect='stretch')
+        canvas = fused.new_canvas(frame.shape)
+
+        def double_resize():
+            resized = cv2.resize(frame, VIDEO_FRAME_SIZE, interpolation=cv2.INTER_CUBIC)
+            double.compose(resized, out=canvas)
+
+        double_ms = _time_call(double_resize, repeat)
+        fused_ms = _time_call(lambda: fused.compose(frame, out=canvas), repeat)
+        rows.append(f"{name:<10} {1000 / double_ms:>18.1f} {1000 / fused_ms:>10.1f} "
+                    f"{double_ms / fused_ms:>7.1f}x")
+    return rows
+
+
+def _write_clip(path: str, width: int, height: int, frames: int = 60, fps: float = 30.0):
+    """Write a synthetic MJPG clip with a moving frame counter"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    base = _random_frame(width, height)
+    for i in range(frames):
+        frame = base.copy()
+        cv2.putText(frame, str(i), (width // 4, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                    height / 100, (0, 255, 0), 3)
+        writer.write(frame)
+    writer.release()
+
+
+def bench_pipeline(repeat: int, frames: int = 60) -> List[str]:
+    """End-to-end process_video_hologram throughput: serial vs threaded pipeline vs segment processes"""
+    modes = {'serial': {}, 'pipeline x2': {'workers': 2}, f'pipeline x{os.cpu_count()}': {'workers': os.cpu_count()},
+             f'segments x{os.cpu_count()}': {'processes': 0}}
+    rows = [f"{'resolution':<10} " + ' '.join(f"{mode + ' fps':>18}" for mode in modes)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (width, height) in list(RESOLUTIONS.items())[:3]:
+            clip = os.path.join(tmp, f"{name}.avi")
+            _write_clip(clip, width, height, frames)
+            output = os.path.join(tmp, 'out.avi')
+            cells = []
+            for kwargs in modes.values():
+                elapsed_ms = _time_call(lambda: process_video_hologram(clip, output, **kwargs), min(repeat, 3))
+                cells.append(f"{frames * 1000 / elapsed_ms:>18.1f}")
+            rows.append(f"{name:<10} " + ' '.join(cells))
+    return rows
+
+
+def bench_encoder(repeat: int, frames: int = 60) -> List[str]:
+    """Encode throughput and output size of hologram canvases per writer backend"""
+    backends = [('mp4v', '.mp4'), ('XVID', '.avi'), ('MJPG', '.avi'), ('ffmpeg', '.mp4')]
+    rows = [f"{'resolution':<10} {'backend':<8} {'fps':>8} {'KiB':>9}"]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (width, height) in list(RESOLUTIONS.items())[:3]:
+            engine = HologramEngine(frame_size=VIDEO_FRAME_SIZE)
+            canvas = engine.compose(_random_frame(width, height))
+            size = (canvas.shape[1], canvas.shape[0])
+            for backend, ext in backends:
+                path = os.path.join(tmp, f"out{ext}")
+
+                def encode():
+                    if backend == 'ffmpeg':
+                        writer = FFmpegWriter(path, 30.0, size, FFmpegSettings())
+                    else:
+                        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*backend), 30.0, size)
+                    if not writer.isOpened():
+                        return False
+                    for _ in range(frames):
+                        writer.write(canvas)
+                    writer.release()
+                    return True
+
+                if not encode():
+                    rows.append(f"{name:<10} {backend:<8} {'unavailable':>18}")
+                    continue
+                elapsed_ms = _time_call(encode, min(repeat, 3))
+                rows.append(f"{name:<10} {backend:<8} {frames * 1000 / elapsed_ms:>8.1f} "
+                            f"{os.path.getsize(path) / 1024:>9.0f}")
+    return rows
+
+
+SUITES: Dict[str, Callable[[int], List[str]]] = {
+    'batch': bench_batch,
+    'compose': bench_compose,
+    'encoder': bench_encoder,
+    'pipeline': bench_pipeline,
+    'remap': bench_remap,
+    'rotation': bench_rotation,
+    'video': bench_video_resize
+}
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Hologram generator benchmarks')
+    parser.add_argument('--suite', choices=sorted(SUITES) + ['all'], default='all',
+                        help='Benchmark suite to run')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Timed repetitions per measurement (best is reported)')
+    args = parser.parse_args()
+
+    suites = sorted(SUITES) if args.suite == 'all' else [args.suite]
+    for suite in suites:
+        print(f"\n=== {suite} ===")
+        for row in SUITES[suite](args.repeat):
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,70 +6,729 @@ Following holomind_bisa patterns for clean integration
 
 import cv2
 import numpy as np
+import hashlib
+import io
+import json
 import logging
-from typing import Tuple, Optional
+import math
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
 logger = logging.getLogger(__name__)
 
-def makeHologram(original, scale: float = 0.5, scaleR: int = 4, distance: int = 0):
+# Bytes of frame and canvas buffers a batched video job may hold at once
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+# Composition modes: 'views' resizes once and places four rotated views,
+# 'remap' produces the whole canvas with one cv2.remap over the source frame
+COMPOSE_MODES = ('views', 'remap')
+
+# How frames are fitted into a fixed frame_size: distort to fill, pad with black bars,
+# or crop the centre to the target aspect ratio
+ASPECT_MODES = ('stretch', 'letterbox', 'crop')
+
+# Frame size the video paths normalize every frame to before scaling
+VIDEO_FRAME_SIZE = (640, 640)
+
+# cv2.VideoWriter fourccs and containers in order of preference
+VIDEO_CODECS = (('mp4v', '.mp4'), ('XVID', '.avi'), ('H264', '.mp4'), ('MJPG', '.avi'))
+
+# In-memory image encodings: format name -> (cv2.imencode extension, quality flag)
+IMAGE_ENCODINGS = {
+    'png': ('.png', None),
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY)
+}
+
+# Bump when the on-disk remap map format or the layout geometry changes
+REMAP_CACHE_VERSION = 1
+
+# Bump whenever the pixels produced for the same input and settings change, so cached
+# results from older versions are not served
+ENGINE_VERSION = 2
+
+# Map value for canvas pixels outside every view; well clear of the frame so cv2.remap
+# takes its fast all-border path instead of blending with edge pixels
+_REMAP_OUTSIDE = -16.0
+
+
+@dataclass(frozen=True)
+class ViewPlacement:
+    """Where one rotated view of the scaled frame lands on the hologram canvas"""
+    name: str
+    angle: int
+    rotate_code: Optional[int]  # cv2.rotate code for exact quarter turns
+    matrix: Optional[np.ndarray]  # Affine matrix for any other angle, None when not needed
+    size: Tuple[int, int]  # (width, height) of the rotated view
+    target: Tuple[slice, slice]  # Canvas region written by this view
+    source: Tuple[slice, slice]  # Region of the rotated view copied into target
+    clipped: bool  # True when only part of the rotated view fits on the canvas
+
+
+@dataclass(frozen=True)
+class LayoutPlan:
     """
-    Create 3D hologram from image (must have equal dimensions)
-    Extracted and adapted from 3DHologram.py
+    Geometry of a hologram for one input shape and set of settings
+    Everything here is independent of pixel values, so it is computed once and reused per frame
+    """
+    input_shape: Tuple[int, ...]
+    scale: float
+    scaleR: int
+    distance: int
+    frame_size: Optional[Tuple[int, int]]  # (width, height) frames are normalized to, None for native
+    aspect: str
+    view_size: Tuple[int, int]  # (width, height) of the scaled frame
+    crop: Tuple[slice, slice]  # Input region that is resampled
+    fit: Tuple[slice, slice]  # Region of the scaled frame the crop is resampled into
+    canvas_shape: Tuple[int, ...]
+    views: Tuple[ViewPlacement, ...]
+
+    @property
+    def key(self) -> Tuple:
+        """Settings that identify this layout"""
+        return (self.input_shape, self.scale, self.scaleR, self.distance, self.frame_size, self.aspect)
+
+    @property
+    def fit_size(self) -> Tuple[int, int]:
+        """(width, height) the cropped input is resampled to"""
+        return (self.fit[1].stop - self.fit[1].start, self.fit[0].stop - self.fit[0].start)
+
+
+# Clockwise quarter turns, done by exact index remapping instead of interpolation
+_QUARTER_TURNS = {
+    90: cv2.ROTATE_90_CLOCKWISE,
+    180: cv2.ROTATE_180,
+    270: cv2.ROTATE_90_COUNTERCLOCKWISE
+}
+
+# np.rot90 turn counts matching each cv2.rotate code, used to crop clipped views without copying
+_ROT90_TURNS = {
+    cv2.ROTATE_90_CLOCKWISE: -1,
+    cv2.ROTATE_180: 2,
+    cv2.ROTATE_90_COUNTERCLOCKWISE: 1
+}
+
+
+def _rotation_matrix(h: int, w: int, angle: int) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Affine matrix and bounding (width, height) used by rotate_bound"""
+    (cX, cY) = (w // 2, h // 2)
+
+    # Grab the rotation matrix (applying the negative of the angle to rotate clockwise),
+    # then grab the sine and cosine (i.e., the rotation components of the matrix)
+    M = cv2.getRotationMatrix2D((cX, cY), -angle, 1.0)
+    cos = np.abs(M[0, 0])
+    sin = np.abs(M[0, 1])
+
+    # Compute the new bounding dimensions of the image
+    nW = int((h * sin) + (w * cos))
+    nH = int((h * cos) + (w * sin))
+
+    # Adjust the rotation matrix to take into account translation
+    M[0, 2] += (nW / 2) - cX
+    M[1, 2] += (nH / 2) - cY
+
+    return M, (nW, nH)
+
+
+def _view_rotation(h: int, w: int, angle: int) -> Tuple[Optional[int], Optional[np.ndarray], Tuple[int, int]]:
+    """How to rotate an (h, w) image by angle: (rotate_code, matrix, (width, height))"""
+    turn = angle % 360
+    if turn == 0:
+        return None, None, (w, h)
+    if turn in _QUARTER_TURNS:
+        return _QUARTER_TURNS[turn], None, ((w, h) if turn == 180 else (h, w))
+
+    M, size = _rotation_matrix(h, w, angle)
+    return None, M, size
+
+
+def _rotate_view(image: np.ndarray, view: ViewPlacement) -> np.ndarray:
+    """Apply the rotation recorded in a view placement"""
+    if view.rotate_code is not None:
+        return cv2.rotate(image, view.rotate_code)
+    if view.matrix is not None:
+        return cv2.warpAffine(image, view.matrix, view.size)
+    return image
+
+
+def _write_view(image: np.ndarray, view: ViewPlacement, region: np.ndarray):
+    """Write one rotated view straight into its canvas region, without temporaries"""
+    if view.rotate_code is not None:
+        if view.clipped:
+            np.copyto(region, np.rot90(image, _ROT90_TURNS[view.rotate_code])[view.source])
+        else:
+            cv2.rotate(image, view.rotate_code, dst=region)
+    elif view.matrix is not None:
+        if view.clipped:
+            region[...] = _rotate_view(image, view)[view.source]
+        else:
+            cv2.warpAffine(image, view.matrix, view.size, dst=region)
+    else:
+        np.copyto(region, image[view.source])
+
+
+def _clip_region(canvas_shape: Tuple[int, ...], y: int, x: int,
+                 view_h: int, view_w: int) -> Tuple[Tuple[slice, slice], Tuple[slice, slice]]:
+    """Clip a view placed at (y, x) to the canvas, returning (target, source) slices"""
+    y0, x0 = max(0, y), max(0, x)
+    y1, x1 = min(canvas_shape[0], y + view_h), min(canvas_shape[1], x + view_w)
+    target = (slice(y0, y1), slice(x0, x1))
+    source = (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+    return target, source
+
+
+def _fit_regions(in_h: int, in_w: int, view_w: int, view_h: int,
+                 aspect: str) -> Tuple[Tuple[slice, slice], Tuple[slice, slice]]:
+    """Input region to resample and the view region it lands in, for an aspect mode"""
+    crop = (slice(0, in_h), slice(0, in_w))
+    fit = (slice(0, view_h), slice(0, view_w))
+
+    if aspect == 'letterbox':
+        ratio = min(view_w / in_w, view_h / in_h)
+        fit_w = min(view_w, max(1, round(in_w * ratio)))
+        fit_h = min(view_h, max(1, round(in_h * ratio)))
+        x0, y0 = (view_w - fit_w) // 2, (view_h - fit_h) // 2
+        fit = (slice(y0, y0 + fit_h), slice(x0, x0 + fit_w))
+    elif aspect == 'crop':
+        ratio = max(view_w / in_w, view_h / in_h)
+        crop_w = min(in_w, max(1, round(view_w / ratio)))
+        crop_h = min(in_h, max(1, round(view_h / ratio)))
+        x0, y0 = (in_w - crop_w) // 2, (in_h - crop_h) // 2
+        crop = (slice(y0, y0 + crop_h), slice(x0, x0 + crop_w))
+
+    return crop, fit
+
+
+@lru_cache(maxsize=32)
+def build_layout_plan(input_shape: Tuple[int, ...], scale: float = 0.5,
+                      scaleR: int = 4, distance: int = 0,
+                      frame_size: Optional[Tuple[int, int]] = None,
+                      aspect: str = 'stretch') -> LayoutPlan:
+    """
+    Compute the hologram layout for a given input shape and settings
+
+    With frame_size set, the view size is scale * frame_size whatever the input shape,
+    so frames of any size are resampled exactly once (fitted according to aspect).
 
     Args:
-        original: Input image (numpy array)
-        scale: Factor de escala de la imagen (default: 0.5)
-        scaleR: Factor de escala del holograma (default: 4)
-        distance: Distancia entre las imágenes rotadas (default: 0)
+        input_shape: Shape of the input frames (height, width[, channels])
+        scale: Factor de escala de la imagen
+        scaleR: Factor de escala del holograma
+        distance: Distancia entre las imágenes rotadas
+        frame_size: (width, height) to normalize frames to before scaling, None for native size
+        aspect: One of ASPECT_MODES, how the input is fitted into frame_size
 
     Returns:
-        Hologram image as numpy array
+        LayoutPlan with the view size, canvas shape and per-view placement
     """
-    try:
-        logger.info(f"Generating hologram with scale={scale}, scaleR={scaleR}, distance={distance}")
+    if aspect not in ASPECT_MODES:
+        raise ValueError(f"Unknown aspect mode '{aspect}'. Expected one of {ASPECT_MODES}")
+
+    base_w, base_h = frame_size if frame_size else (input_shape[1], input_shape[0])
+    height = int(scale * base_h)
+    width = int(scale * base_w)
+    if height <= 0 or width <= 0:
+        raise ValueError(f"Scale {scale} leaves no pixels for input shape {input_shape}")
+
+    crop, fit = _fit_regions(input_shape[0], input_shape[1], width, height, aspect)
+
+    # Rotated views: (name, angle, rotate_code, matrix, (width, height))
+    rotated = [(name, angle) + _view_rotation(height, width, angle)
+               for name, angle in (('up', 0), ('down', 180), ('right', 90), ('left', 270))]
+
+    # Calculate the maximum dimensions needed for all rotated images
+    max_height = max(size[1] for *_, size in rotated)
+    max_width = max(size[0] for *_, size in rotated)
+
+    canvas_shape = (max_height * scaleR + distance, max_width * scaleR + distance) + tuple(input_shape[2:])
+    center_y = canvas_shape[0] // 2
+    center_x = canvas_shape[1] // 2
+
+    origins = {
+        # Up image (top) and down image (bottom), centered horizontally
+        'up': (0, center_x - width // 2 + distance),
+        'down': (canvas_shape[0] - height, center_x - width // 2 + distance),
+    }
+
+    views = []
+    for name, angle, code, M, (view_w, view_h) in rotated:
+        if name == 'right':
+            # Right image (right side)
+            origin = (center_y - view_h // 2, canvas_shape[1] - view_w + distance)
+        elif name == 'left':
+            # Left image (left side)
+            origin = (center_y - view_h // 2, distance)
+        else:
+            origin = origins[name]
+
+        target, source = _clip_region(canvas_shape, origin[0], origin[1], view_h, view_w)
+        clipped = (source[0].stop - source[0].start, source[1].stop - source[1].start) != (view_h, view_w)
+        views.append(ViewPlacement(name, angle, code, M, (view_w, view_h), target, source, clipped))
+
+    return LayoutPlan(
+        input_shape=tuple(input_shape),
+        scale=scale,
+        scaleR=scaleR,
+        distance=distance,
+        frame_size=tuple(frame_size) if frame_size else None,
+        aspect=aspect,
+        view_size=(width, height),
+        crop=crop,
+        fit=fit,
+        canvas_shape=canvas_shape,
+        views=tuple(views)
+    )
+
+
+def _unrotate_coords(view: ViewPlacement, cols: np.ndarray, rows: np.ndarray,
+                     width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Map rotated-view pixel coordinates back to (x, y) in the scaled frame"""
+    if view.rotate_code == cv2.ROTATE_90_CLOCKWISE:
+        return rows, height - 1 - cols
+    if view.rotate_code == cv2.ROTATE_180:
+        return width - 1 - cols, height - 1 - rows
+    if view.rotate_code == cv2.ROTATE_90_COUNTERCLOCKWISE:
+        return width - 1 - rows, cols
+    if view.matrix is not None:
+        inv = cv2.invertAffineTransform(view.matrix)
+        return (inv[0, 0] * cols + inv[0, 1] * rows + inv[0, 2],
+                inv[1, 0] * cols + inv[1, 1] * rows + inv[1, 2])
+    return cols, rows
+
+
+def build_remap_maps(plan: LayoutPlan) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build float32 cv2.remap maps taking every canvas pixel straight to a source pixel
+
+    Pixels outside every view map outside the frame, which cv2.remap fills with black.
+
+    Args:
+        plan: Layout plan of the hologram
+
+    Returns:
+        (map_x, map_y) arrays of the canvas height and width
+    """
+    map_x = np.full(plan.canvas_shape[:2], _REMAP_OUTSIDE, np.float32)
+    map_y = np.full(plan.canvas_shape[:2], _REMAP_OUTSIDE, np.float32)
+
+    width, height = plan.view_size
+    crop_y, crop_x = plan.crop
+    fit_y, fit_x = plan.fit
+    # cv2.resize maps output pixel centres onto input pixel centres
+    fx = (crop_x.stop - crop_x.start) / (fit_x.stop - fit_x.start)
+    fy = (crop_y.stop - crop_y.start) / (fit_y.stop - fit_y.start)
+
+    for view in plan.views:
+        cols, rows = np.meshgrid(np.arange(view.source[1].start, view.source[1].stop, dtype=np.float64),
+                                 np.arange(view.source[0].start, view.source[0].stop, dtype=np.float64))
+        sx, sy = _unrotate_coords(view, cols, rows, width, height)
+        inside = ((sx > fit_x.start - 1) & (sx < fit_x.stop) &
+                  (sy > fit_y.start - 1) & (sy < fit_y.stop))
+
+        map_x[view.target] = np.where(inside, crop_x.start + (sx - fit_x.start + 0.5) * fx - 0.5,
+                                      _REMAP_OUTSIDE)
+        map_y[view.target] = np.where(inside, crop_y.start + (sy - fit_y.start + 0.5) * fy - 0.5,
+                                      _REMAP_OUTSIDE)
+
+    return map_x, map_y
+
+
+def load_remap_maps(plan: LayoutPlan, cache_dir: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get fixed-point remap maps for a layout, using an on-disk cache when cache_dir is set
+
+    Args:
+        plan: Layout plan of the hologram
+        cache_dir: Directory for cached maps (None disables the disk cache)
+
+    Returns:
+        (map1, map2) as produced by cv2.convertMaps with CV_16SC2
+    """
+    path = None
+    if cache_dir:
+        geometry = f"{plan.key}|v{REMAP_CACHE_VERSION}"
+        digest = hashlib.sha1(geometry.encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir, f"holomap_{digest}.npz")
+
+        try:
+            with np.load(path) as cached:
+                logger.debug(f"Loaded remap maps from {path}")
+                return cached['map1'], cached['map2']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable remap cache {path}: {e}")
+
+    map1, map2 = cv2.convertMaps(*build_remap_maps(plan), cv2.CV_16SC2)
+
+    if path:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            # Write to a temporary file first so concurrent workers never read a partial cache
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, map1=map1, map2=map2)
+            os.replace(tmp_path, path)
+            logger.info(f"Cached remap maps for input {plan.input_shape} at {path}")
+        except OSError as e:
+            logger.warning(f"Could not cache remap maps at {path}: {e}")
+
+    return map1, map2
+
+
+class HologramEngine:
+    """
+    Reusable hologram compositor for frame sequences
+    Builds a LayoutPlan once per input shape and settings, so per-frame cost is only the pixel work
+
+    In 'remap' mode the plan is turned into a pair of remap maps (cached in map_cache_dir
+    when given) and each hologram is produced by a single cv2.remap over the source frame.
+
+    With frame_size set, frames are fitted to that size (see ASPECT_MODES) and scaled in
+    the same resample, instead of being resized to frame_size first and scaled again.
+    """
+
+    def __init__(self, scale: float = 0.5, scaleR: int = 4, distance: int = 0,
+                 mode: str = 'views', map_cache_dir: Optional[str] = None,
+                 interpolation: int = cv2.INTER_LINEAR,
+                 frame_size: Optional[Tuple[int, int]] = None, aspect: str = 'stretch'):
+        if mode not in COMPOSE_MODES:
+            raise ValueError(f"Unknown compose mode '{mode}'. Expected one of {COMPOSE_MODES}")
+        if aspect not in ASPECT_MODES:
+            raise ValueError(f"Unknown aspect mode '{aspect}'. Expected one of {ASPECT_MODES}")
+
+        self.scale = scale
+        self.scaleR = scaleR
+        self.distance = distance
+        self.mode = mode
+        self.map_cache_dir = map_cache_dir
+        self.interpolation = interpolation  # Used by 'remap' mode only
+        self.frame_size = tuple(frame_size) if frame_size else None
+        self.aspect = aspect
+        self._plans: Dict[Tuple, LayoutPlan] = {}
+        self._local = threading.local()  # Per-thread resize buffers, so compose is thread-safe
+        self._maps: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}  # Remap maps per layout
 
-        height = int(scale * original.shape[0])
-        width = int(scale * original.shape[1])
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Constructor arguments, for rebuilding an equivalent engine in another process"""
+        return {
+            'scale': self.scale,
+            'scaleR': self.scaleR,
+            'distance': self.distance,
+            'mode': self.mode,
+            'map_cache_dir': self.map_cache_dir,
+            'interpolation': self.interpolation,
+            'frame_size': self.frame_size,
+            'aspect': self.aspect
+        }
 
-        image = cv2.resize(original, (width, height), interpolation=cv2.INTER_CUBIC)
+    def plan_for(self, shape: Tuple[int, ...]) -> LayoutPlan:
+        """Get (or build and cache) the layout plan for frames of the given shape"""
+        key = (tuple(shape), self.scale, self.scaleR, self.distance, self.frame_size, self.aspect)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = build_layout_plan(*key)
+            self._plans[key] = plan
+            logger.debug(f"Built hologram layout for input {plan.input_shape}: "
+                         f"view {plan.view_size[0]}x{plan.view_size[1]}, canvas {plan.canvas_shape}")
+        return plan
 
-        # Create rotated versions
-        up = image.copy()
-        down = rotate_bound(image.copy(), 180)
-        right = rotate_bound(image.copy(), 90)
-        left = rotate_bound(image.copy(), 270)
+    def new_canvas(self, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Allocate a black canvas suitable as the out= buffer for frames of the given shape"""
+        return np.zeros(self.plan_for(shape).canvas_shape, dtype)
 
-        # Calculate the maximum dimensions needed for all rotated images
-        max_height = max(up.shape[0], down.shape[0], right.shape[0], left.shape[0])
-        max_width = max(up.shape[1], down.shape[1], right.shape[1], left.shape[1])
+    def canvas_pool(self, shape: Tuple[int, ...], size: int = 4, dtype=np.uint8) -> 'CanvasPool':
+        """Create a pool of reusable canvases for frames of the given shape"""
+        return CanvasPool(self.plan_for(shape).canvas_shape, size, dtype)
 
-        hologram = np.zeros([max_height * scaleR + distance, max_width * scaleR + distance, 3], image.dtype)
+    def compose(self, frame: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Create the hologram for a single frame
 
-        center_x = int(hologram.shape[0] / 2)
-        center_y = int(hologram.shape[1] / 2)
+        When out is given, each view is written directly into its canvas region and
+        nothing is allocated per frame. In 'views' mode only the view regions are written,
+        so out must start black (see new_canvas / CanvasPool) and only be reused with the
+        same layout; 'remap' mode writes every canvas pixel.
 
-        # Place up image (top)
-        start_x = max(0, center_x - up.shape[1] // 2 + distance)
-        end_x = min(hologram.shape[1], center_x + up.shape[1] // 2 + distance)
-        hologram[0:up.shape[0], start_x:end_x] = up
+        Args:
+            frame: Input image (numpy array)
+            out: Optional preallocated canvas of shape plan.canvas_shape
 
-        # Place down image (bottom)
-        down_start_y = hologram.shape[0] - down.shape[0]
-        down_start_x = max(0, center_x - down.shape[1] // 2 + distance)
-        down_end_x = min(hologram.shape[1], center_x + down.shape[1] // 2 + distance)
-        hologram[down_start_y:hologram.shape[0], down_start_x:down_end_x] = down
+        Returns:
+            Hologram image as numpy array (out itself when given)
+        """
+        plan = self.plan_for(frame.shape)
 
-        # Place right image (right side)
-        right_start_x = hologram.shape[1] - right.shape[1] + distance
-        right_start_y = max(0, center_x - right.shape[0] // 2)
-        right_end_y = min(hologram.shape[0], right_start_y + right.shape[0])
-        hologram[right_start_y:right_end_y, right_start_x:right_start_x + right.shape[1]] = right
+        if out is None:
+            out = np.zeros(plan.canvas_shape, frame.dtype)
+        elif out.shape != plan.canvas_shape or out.dtype != frame.dtype:
+            raise ValueError(f"Output canvas must be {plan.canvas_shape} {frame.dtype}, "
+                             f"got {out.shape} {out.dtype}")
 
-        # Place left image (left side)
-        left_start_x = distance
-        left_start_y = max(0, center_x - left.shape[0] // 2)
-        left_end_y = min(hologram.shape[0], left_start_y + left.shape[0])
-        hologram[left_start_y:left_end_y, left_start_x:left_start_x + left.shape[1]] = left
+        self._compose_into(plan, frame, out)
+        return out
+
+    def compose_batch(self, frames: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Create holograms for a stack of frames in one call
+
+        The layout, buffers and validation are handled once for the whole batch; each
+        frame then goes through the same allocation-free OpenCV kernels as compose().
+
+        Args:
+            frames: Frame stack of shape (N, H, W, C)
+            out: Optional preallocated canvas stack of shape (N,) + plan.canvas_shape
+
+        Returns:
+            Hologram stack as numpy array (out itself when given)
+        """
+        if frames.ndim != 4:
+            raise ValueError(f"Expected a (N, H, W, C) frame stack, got shape {frames.shape}")
+
+        plan = self.plan_for(frames.shape[1:])
+        batch_shape = (frames.shape[0],) + plan.canvas_shape
+
+        if out is None:
+            out = np.zeros(batch_shape, frames.dtype)
+        elif out.shape != batch_shape or out.dtype != frames.dtype:
+            raise ValueError(f"Output stack must be {batch_shape} {frames.dtype}, "
+                             f"got {out.shape} {out.dtype}")
+
+        for frame, canvas in zip(frames, out):
+            self._compose_into(plan, frame, canvas)
+
+        return out
+
+    def batch_size_for(self, shape: Tuple[int, ...], memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                       dtype=np.uint8) -> int:
+        """Largest batch of frames of the given shape whose frame and canvas buffers fit the budget"""
+        plan = self.plan_for(shape)
+        itemsize = np.dtype(dtype).itemsize
+        frame_bytes = (int(np.prod(plan.input_shape)) + int(np.prod(plan.canvas_shape))) * itemsize
+        return max(1, memory_budget // frame_bytes)
+
+    def _scaled_buffer(self, plan: LayoutPlan, dtype) -> np.ndarray:
+        """Reusable buffer holding the scaled frame for a layout"""
+        buffers = getattr(self._local, 'scaled', None)
+        if buffers is None:
+            buffers = self._local.scaled = {}
+        scaled = buffers.get(plan.key)
+        if scaled is None or scaled.dtype != dtype:
+            # Zeroed once so letterbox bars outside plan.fit stay black
+            scaled = np.zeros((plan.view_size[1], plan.view_size[0]) + plan.input_shape[2:], dtype)
+            buffers[plan.key] = scaled
+        return scaled
+
+    def _remap_maps(self, plan: LayoutPlan) -> Tuple[np.ndarray, np.ndarray]:
+        """Remap maps for a layout, loaded from disk or built on first use"""
+        maps = self._maps.get(plan.key)
+        if maps is None:
+            maps = load_remap_maps(plan, self.map_cache_dir)
+            self._maps[plan.key] = maps
+        return maps
+
+    def _compose_into(self, plan: LayoutPlan, frame: np.ndarray, out: np.ndarray):
+        """Compose one frame into out according to the engine mode"""
+        if self.mode == 'remap':
+            map1, map2 = self._remap_maps(plan)
+            cv2.remap(frame, map1, map2, self.interpolation, dst=out, borderMode=cv2.BORDER_CONSTANT)
+            return
+
+        scaled = self._scaled_buffer(plan, frame.dtype)
+        cv2.resize(frame[plan.crop], plan.fit_size, dst=scaled[plan.fit], interpolation=cv2.INTER_CUBIC)
+
+        for view in plan.views:
+            _write_view(scaled, view, out[view.target])
+
+
+class CanvasPool:
+    """
+    Fixed set of reusable black canvases for pipelined video writing
+    acquire() blocks until a canvas is free, so the pool also bounds frames in flight
+    """
+
+    def __init__(self, canvas_shape: Tuple[int, ...], size: int = 4, dtype=np.uint8):
+        self.canvas_shape = tuple(canvas_shape)
+        self.size = size
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._free.put(np.zeros(self.canvas_shape, dtype))
+
+    def acquire(self, timeout: Optional[float] = None) -> np.ndarray:
+        """Take a canvas from the pool, waiting up to timeout seconds"""
+        return self._free.get(timeout=timeout)
+
+    def release(self, canvas: np.ndarray):
+        """Return a canvas to the pool once its frame has been written"""
+        if canvas.shape != self.canvas_shape:
+            raise ValueError(f"Canvas {canvas.shape} does not belong to pool of {self.canvas_shape}")
+        self._free.put(canvas)
+
+
+class FrameDeduplicator:
+    """
+    Detects frames that repeat the last composed frame, so its hologram can be reused
+
+    Frames are compared through a small downsampled thumbnail. With threshold=0 a frame
+    only counts as a duplicate when it is bit-identical to the last composed frame (the
+    thumbnail just rejects most changes cheaply); otherwise threshold is the largest mean
+    absolute thumbnail difference, in 0-255 pixel levels, still treated as the same frame.
+    Frames are always compared against the last composed frame, not the previous one, so
+    slow fades cannot drift past the threshold one small step at a time.
+    """
+
+    def __init__(self, threshold: float = 0.0, thumbnail_size: Tuple[int, int] = (32, 32)):
+        if threshold < 0:
+            raise ValueError(f"Duplicate threshold must be >= 0, got {threshold}")
+        self.threshold = threshold
+        self.thumbnail_size = thumbnail_size
+        self.frames = 0
+        self.hits = 0
+        self._thumbnail: Optional[np.ndarray] = None
+        self._scratch: Optional[np.ndarray] = None
+        self._keyframe: Optional[np.ndarray] = None  # Full copy of the last composed frame (exact mode)
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of checked frames that reused the previous hologram"""
+        return self.hits / self.frames if self.frames else 0.0
+
+    def is_duplicate(self, frame: np.ndarray) -> bool:
+        """
+        Check a frame against the last composed one
+
+        Returns True when the frame's hologram can be reused. Otherwise the frame becomes
+        the new reference and the caller must compose it.
+        """
+        self.frames += 1
+        thumbnail_shape = self.thumbnail_size[::-1] + frame.shape[2:]
+        if self._scratch is None or self._scratch.shape != thumbnail_shape or self._scratch.dtype != frame.dtype:
+            # First frame, or a new frame format: start over without a reference
+            self._thumbnail = None
+            self._keyframe = None
+            self._scratch = np.empty(thumbnail_shape, frame.dtype)
+
+        thumbnail = cv2.resize(frame, self.thumbnail_size, dst=self._scratch, interpolation=cv2.INTER_AREA)
+        if self._thumbnail is not None:
+            if self.threshold > 0:
+                duplicate = cv2.norm(thumbnail, self._thumbnail, cv2.NORM_L1) <= self.threshold * thumbnail.size
+            else:
+                duplicate = np.array_equal(thumbnail, self._thumbnail) and np.array_equal(frame, self._keyframe)
+            if duplicate:
+                self.hits += 1
+                return True
+
+        # New reference frame; swap buffers so the next thumbnail does not allocate
+        self._scratch, self._thumbnail = (self._thumbnail if self._thumbnail is not None
+                                          else np.empty_like(thumbnail)), thumbnail
+        if self.threshold == 0:
+            if self._keyframe is None:
+                self._keyframe = np.empty_like(frame)
+            np.copyto(self._keyframe, frame)
+        return False
+
+
+@dataclass
+class VideoJobSummary:
+    """Outcome of a successful process_video_hologram run"""
+    output_file: str
+    frames: int  # Frames written to the output
+    duplicate_frames: int = 0  # Frames whose hologram was reused instead of composed
+    elapsed: float = 0.0  # Wall time in seconds
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of written frames served by duplicate detection"""
+        return self.duplicate_frames / self.frames if self.frames else 0.0
+
+
+@dataclass(frozen=True)
+class VideoProgress:
+    """Snapshot of a running video job, passed to progress callbacks"""
+    frames_done: int
+    total_frames: Optional[int]  # None when the container does not report a frame count
+    fps: float  # Frames per second since the job started
+    eta: Optional[float]  # Seconds remaining, None when unknown
+    elapsed: float
+
+    @property
+    def percent(self) -> Optional[float]:
+        """Completion in percent, None when the total is unknown"""
+        if not self.total_frames:
+            return None
+        return min(100.0, 100.0 * self.frames_done / self.total_frames)
+
+
+class ProgressTracker:
+    """
+    Turns frame counts into VideoProgress callbacks, at most once per interval seconds
+
+    update() may be called for every frame; the callback runs on the calling thread and
+    its exceptions are logged instead of interrupting the job.
+    """
+
+    def __init__(self, callback: Callable[[VideoProgress], None],
+                 total_frames: Optional[int] = None, interval: float = 0.5):
+        self.callback = callback
+        self.total_frames = total_frames if total_frames and total_frames > 0 else None
+        self.interval = interval
+        self._start = time.monotonic()
+        self._last_report = float('-inf')
+
+    def snapshot(self, frames_done: int) -> VideoProgress:
+        """Progress numbers for frames_done frames at the current time"""
+        elapsed = time.monotonic() - self._start
+        fps = frames_done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total_frames is not None and fps > 0:
+            eta = max(0, self.total_frames - frames_done) / fps
+        return VideoProgress(frames_done, self.total_frames, fps, eta, elapsed)
+
+    def update(self, frames_done: int, force: bool = False):
+        """Report progress if the interval has passed since the last report (or force)"""
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        try:
+            self.callback(self.snapshot(frames_done))
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+
+
+def makeHologram(original, scale: float = 0.5, scaleR: int = 4, distance: int = 0):
+    """
+    Create 3D hologram from image (must have equal dimensions)
+    Extracted and adapted from 3DHologram.py
+
+    Args:
+        original: Input image (numpy array), or an (N, H, W, C) stack of frames
+        scale: Factor de escala de la imagen (default: 0.5)
+        scaleR: Factor de escala del holograma (default: 4)
+        distance: Distancia entre las imágenes rotadas (default: 0)
+
+    Returns:
+        Hologram image as numpy array ((N, Hc, Wc, C) for a frame stack)
+    """
+    try:
+        logger.info(f"Generating hologram with scale={scale}, scaleR={scaleR}, distance={distance}")
+
+        engine = HologramEngine(scale, scaleR, distance)
+        if original.ndim == 4:
+            hologram = engine.compose_batch(original)
+        else:
+            hologram = engine.compose(original)
 
         logger.info(f"Hologram generated successfully. Shape: {hologram.shape}")
         return hologram
@@ -83,46 +742,739 @@ def rotate_bound(image, angle: int) -> np.ndarray:
     Rotate an image with bounds checking
     Extracted from 3DHologram.py
 
+    Multiples of 90 degrees take the exact quarter-turn path (see rotate_quarter);
+    any other angle is interpolated with cv2.warpAffine.
+
     Args:
         image: Input image
-        angle: Rotation angle in degrees
+        angle: Rotation angle in degrees (clockwise)
 
     Returns:
         Rotated image
     """
-    # Grab the dimensions of the image and then determine the center
+    if angle % 90 == 0:
+        return rotate_quarter(image, angle)
+
+    # Grab the dimensions of the image and compute the rotation matrix and bounding size
     (h, w) = image.shape[:2]
-    (cX, cY) = (w // 2, h // 2)
+    M, size = _rotation_matrix(h, w, angle)
 
-    # Grab the rotation matrix (applying the negative of the angle to rotate clockwise),
-    # then grab the sine and cosine (i.e., the rotation components of the matrix)
-    M = cv2.getRotationMatrix2D((cX, cY), -angle, 1.0)
-    cos = np.abs(M[0, 0])
-    sin = np.abs(M[0, 1])
+    # Perform the actual rotation and return the image
+    return cv2.warpAffine(image, M, size)
 
-    # Compute the new bounding dimensions of the image
-    nW = int((h * sin) + (w * cos))
-    nH = int((h * cos) + (w * sin))
+def rotate_quarter(image, angle: int) -> np.ndarray:
+    """
+    Rotate an image clockwise by a multiple of 90 degrees without interpolation
 
-    # Adjust the rotation matrix to take into account translation
-    M[0, 2] += (nW / 2) - cX
-    M[1, 2] += (nH / 2) - cY
+    Args:
+        image: Input image
+        angle: Rotation angle in degrees, must be a multiple of 90
 
-    # Perform the actual rotation and return the image
-    return cv2.warpAffine(image, M, (nW, nH))
+    Returns:
+        Rotated image (always a new array)
+    """
+    turn = angle % 360
+    if turn == 0:
+        return image.copy()
+    if turn not in _QUARTER_TURNS:
+        raise ValueError(f"Angle {angle} is not a multiple of 90 degrees")
+
+    return cv2.rotate(image, _QUARTER_TURNS[turn])
+
+def _run_batched(cap: cv2.VideoCapture, writer: cv2.VideoWriter, engine: HologramEngine,
+                 first_frame: np.ndarray, count: int, batch_size: int,
+                 dedup: Optional[FrameDeduplicator] = None,
+                 progress: Optional[ProgressTracker] = None) -> int:
+    """Decode, compose and write frames in chunks on the calling thread; returns frames written"""
+    canvas_shape = engine.plan_for(first_frame.shape).canvas_shape
+    frames = np.empty((batch_size,) + first_frame.shape, first_frame.dtype)
+    canvases = np.zeros((batch_size,) + canvas_shape, first_frame.dtype)
+    # Last hologram of the previous chunk, for duplicates at the start of a chunk
+    previous = np.zeros(canvas_shape, first_frame.dtype) if dedup is not None else None
+
+    # The probed first frame opens the first batch
+    frames[0] = first_frame
+    if dedup is not None:
+        dedup.is_duplicate(first_frame)
+    processed = 0
+    filled = 1
+    # Canvas slot written for each output frame of the chunk; -1 is the previous chunk's last
+    slots = [0]
+    end_of_video = False
+
+    while slots or not end_of_video:
+        if len(slots) == batch_size or (end_of_video and slots):
+            try:
+                if filled:
+                    engine.compose_batch(frames[:filled], out=canvases[:filled])
+                for slot in slots:
+                    writer.write(previous if slot < 0 else canvases[slot])
+                if previous is not None and slots[-1] >= 0:
+                    np.copyto(previous, canvases[slots[-1]])
+
+                if (processed + len(slots)) // 10 > processed // 10:
+                    logger.info(f"Processed: {processed + len(slots)} frames")
+                processed += len(slots)
+                if progress is not None:
+                    progress.update(processed)
+
+            except Exception as e:
+                logger.warning(f"Error processing batch of {len(slots)} frames ending at frame {count}: {e}")
+            filled = 0
+            slots = []
+            continue
 
-def process_video_hologram(video_path: str, output_path: str) -> bool:
+        # Decode straight into the batch buffer; the engine does the only resample
+        ret, decoded = cap.read(frames[filled])
+        count += 1
+
+        if ret and decoded is not None:
+            if decoded.shape != first_frame.shape:
+                logger.warning(f"Skipping frame {count} with unexpected shape {decoded.shape}")
+                continue
+            if not np.may_share_memory(decoded, frames):
+                frames[filled] = decoded
+
+            if dedup is not None and dedup.is_duplicate(frames[filled]):
+                slots.append(filled - 1)
+            else:
+                slots.append(filled)
+                filled += 1
+        else:
+            if count < 10:
+                logger.warning(f"Video ended unexpectedly at frame {count}")
+            end_of_video = True
+
+    return processed
+
+
+def _put_unless_stopped(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put into a bounded queue, giving up if stop is set while waiting"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _run_pipelined(cap: cv2.VideoCapture, writer: cv2.VideoWriter, engine: HologramEngine,
+                   first_frame: np.ndarray, workers: int, queue_size: int,
+                   dedup: Optional[FrameDeduplicator] = None,
+                   progress: Optional[ProgressTracker] = None) -> int:
+    """
+    Decode, compose and write frames concurrently; returns frames written
+
+    A decoder thread submits frames to a pool of compositor threads and queues the
+    futures in decode order; an encoder thread writes results in that same order.
+    OpenCV releases the GIL in decode, resize/rotate and encode, so the stages overlap.
+    Duplicate frames are queued as (None, None) and the encoder rewrites the last hologram.
+    """
+    canvas_shape = engine.plan_for(first_frame.shape).canvas_shape
+    # Canvases bound the frames in flight: queued, being composed, being written,
+    # and the last written one, held back for duplicate frames
+    pool = CanvasPool(canvas_shape, queue_size + workers + 2, first_frame.dtype)
+    pending: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    processed = 0
+
+    def decode():
+        try:
+            frame = first_frame
+            while frame is not None and not stop.is_set():
+                if dedup is not None and dedup.is_duplicate(frame):
+                    if not _put_unless_stopped(pending, (None, None), stop):
+                        break
+                    ret, frame = cap.read()
+                    if not ret:
+                        frame = None
+                    continue
+
+                canvas = None
+                while canvas is None and not stop.is_set():
+                    try:
+                        canvas = pool.acquire(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                if canvas is None:
+                    break
+
+                future = compositor.submit(engine.compose, frame, canvas)
+                if not _put_unless_stopped(pending, (future, canvas), stop):
+                    break
+
+                ret, frame = cap.read()
+                if not ret:
+                    frame = None
+        except Exception as e:
+            logger.error(f"Decoder thread failed: {e}")
+        finally:
+            _put_unless_stopped(pending, None, stop)
+
+    def encode():
+        nonlocal processed
+        last = None  # Last written canvas, reused for duplicate frames
+        try:
+            while True:
+                item = pending.get()
+                if item is None:
+                    break
+
+                future, canvas = item
+                try:
+                    if future is None:
+                        if last is None:
+                            continue
+                        writer.write(last)
+                    else:
+                        writer.write(future.result())
+                        if last is not None:
+                            pool.release(last)
+                        last, canvas = canvas, None
+                    processed += 1
+                    if processed % 10 == 0:
+                        logger.info(f"Processed: {processed} frames")
+                    if progress is not None:
+                        progress.update(processed)
+                except Exception as e:
+                    logger.warning(f"Error processing frame {processed + 1}: {e}")
+                finally:
+                    if canvas is not None:
+                        pool.release(canvas)
+        except Exception as e:
+            logger.error(f"Encoder thread failed: {e}")
+        finally:
+            if last is not None:
+                pool.release(last)
+            # Unblock the decoder if the encoder stopped early
+            stop.set()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hologram-compose') as compositor:
+        threads = [
+            threading.Thread(target=decode, name='hologram-decode', daemon=True),
+            threading.Thread(target=encode, name='hologram-encode', daemon=True)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return processed
+
+
+@dataclass(frozen=True)
+class FFmpegSettings:
+    """Encoder options for FFmpegWriter"""
+    codec: str = 'libx264'
+    preset: Optional[str] = 'veryfast'  # None for codecs without presets
+    crf: Optional[int] = 23  # None to use the codec's default rate control
+    threads: int = 0  # 0 lets ffmpeg pick
+    pix_fmt: str = 'yuv420p'
+    binary: str = 'ffmpeg'
+
+    def command(self, filename: str, fps: float, size: Tuple[int, int]) -> List[str]:
+        """ffmpeg command line reading raw BGR frames of size (width, height) from stdin"""
+        command = [
+            self.binary, '-y', '-loglevel', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f"{size[0]}x{size[1]}", '-r', f"{fps}",
+            '-i', '-',
+            '-an', '-c:v', self.codec, '-threads', str(self.threads), '-pix_fmt', self.pix_fmt,
+            # Chroma subsampled formats need even dimensions
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'
+        ]
+        if self.preset:
+            command += ['-preset', self.preset]
+        if self.crf is not None:
+            command += ['-crf', str(self.crf)]
+        if filename.lower().endswith(('.mp4', '.mov')):
+            command += ['-movflags', '+faststart']
+        return command + [filename]
+
+
+class FFmpegWriter:
+    """
+    cv2.VideoWriter look-alike that streams raw BGR frames to an ffmpeg process
+
+    Mostly black hologram canvases compress far better with x264/x265 than with the
+    fourcc codecs OpenCV ships, and ffmpeg encodes on its own threads.
+    """
+
+    def __init__(self, filename: str, fps: float, size: Tuple[int, int],
+                 settings: Optional[FFmpegSettings] = None):
+        self.filename = filename
+        self.size = tuple(size)
+        self.settings = settings or FFmpegSettings()
+        self.returncode: Optional[int] = None
+        self._process: Optional[subprocess.Popen] = None
+
+        binary = shutil.which(self.settings.binary)
+        if binary is None:
+            logger.warning(f"ffmpeg binary '{self.settings.binary}' not found")
+            return
+
+        command = self.settings.command(filename, fps, self.size)
+        command[0] = binary
+        try:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError as e:
+            logger.warning(f"Could not start ffmpeg: {e}")
+
+    def isOpened(self) -> bool:
+        """True while the ffmpeg process accepts frames"""
+        return self._process is not None and self._process.poll() is None
+
+    def write(self, frame: np.ndarray):
+        """Send one BGR frame of the writer's size"""
+        if self._process is None:
+            raise RuntimeError("ffmpeg writer is not open")
+        if (frame.shape[1], frame.shape[0]) != self.size:
+            raise ValueError(f"Frame is {frame.shape[1]}x{frame.shape[0]}, writer expects {self.size[0]}x{self.size[1]}")
+        try:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except BrokenPipeError:
+            self.release()
+            raise RuntimeError(f"ffmpeg exited while encoding {self.filename} (code {self.returncode})")
+
+    def release(self):
+        """Finish the stream and wait for ffmpeg to write the file"""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        self.returncode = process.wait()
+        if self.returncode != 0:
+            logger.error(f"ffmpeg failed with code {self.returncode}: {stderr}")
+
+    def abort(self):
+        """Stop ffmpeg without finishing the file"""
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.kill()
+        process.wait()
+
+
+# Pseudo codec name for the ffmpeg backend, next to the fourcc names of cv2.VideoWriter
+FFMPEG_CODEC = 'ffmpeg'
+
+
+def _create_writer(filename: str, codec_name: str, fps: float, size: Tuple[int, int],
+                   ffmpeg: Optional[FFmpegSettings] = None):
+    """Writer for a codec name returned by _open_video_writer"""
+    if codec_name == FFMPEG_CODEC:
+        return FFmpegWriter(filename, fps, size, ffmpeg)
+    return cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*codec_name), fps, size)
+
+
+@dataclass(frozen=True)
+class EncoderCapabilities:
+    """Video encoders that work on this host, as found by probe_encoders"""
+    opencv_version: str
+    fourccs: Tuple[str, ...]  # Working cv2.VideoWriter codecs, in VIDEO_CODECS order
+    ffmpeg_binary: Optional[str]  # Resolved ffmpeg path, None when not installed
+    ffmpeg_encoders: Tuple[str, ...]  # Video encoders the ffmpeg build provides
+    probed_at: float
+
+    def supports_ffmpeg(self, codec: str) -> bool:
+        """True when frames can be piped to ffmpeg and encoded with codec"""
+        return self.ffmpeg_binary is not None and codec in self.ffmpeg_encoders
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, also used for the on-disk cache"""
+        return {
+            'opencv_version': self.opencv_version,
+            'fourccs': list(self.fourccs),
+            'ffmpeg_binary': self.ffmpeg_binary,
+            'ffmpeg_encoders': list(self.ffmpeg_encoders),
+            'probed_at': self.probed_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EncoderCapabilities':
+        return cls(
+            opencv_version=data['opencv_version'],
+            fourccs=tuple(data['fourccs']),
+            ffmpeg_binary=data['ffmpeg_binary'],
+            ffmpeg_encoders=tuple(data['ffmpeg_encoders']),
+            probed_at=data['probed_at']
+        )
+
+
+# Probe results per ffmpeg binary name, shared by every job in the process
+_encoder_capabilities: Dict[str, EncoderCapabilities] = {}
+_encoder_lock = threading.Lock()
+
+
+def _codec_filename(output_path: str, ext: str) -> str:
+    """Output file for a codec's container (.avi codecs swap an .mp4 suffix)"""
+    return output_path.replace('.mp4', '.avi') if ext == '.avi' else output_path
+
+
+def _probe_fourccs() -> Tuple[str, ...]:
+    """Write a two-frame clip with each VIDEO_CODECS entry into a scratch directory"""
+    working = []
+    frame = np.zeros((64, 64, 3), np.uint8)
+    with tempfile.TemporaryDirectory(prefix='encoder_probe_') as tmp:
+        for codec_name, ext in VIDEO_CODECS:
+            path = os.path.join(tmp, f"probe_{codec_name}{ext}")
+            try:
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec_name), 30.0, (64, 64))
+                opened = writer.isOpened()
+                if opened:
+                    writer.write(frame)
+                    writer.write(frame)
+                writer.release()
+                if opened and os.path.getsize(path) > 0:
+                    working.append(codec_name)
+            except Exception as e:
+                logger.debug(f"Codec {codec_name} probe failed: {e}")
+    return tuple(working)
+
+
+def _probe_ffmpeg(binary: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+    """Resolve the ffmpeg binary and list its video encoders"""
+    path = shutil.which(binary)
+    if path is None:
+        return None, ()
+    try:
+        result = subprocess.run([path, '-hide_banner', '-encoders'], capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"ffmpeg probe failed: {e}")
+        return None, ()
+
+    # Encoder lines look like " V....D libx264   libx264 H.264 / AVC ...", after a "------" rule
+    lines = result.stdout.decode(errors='replace').splitlines()
+    start = next((i + 1 for i, line in enumerate(lines) if line.strip().startswith('---')), len(lines))
+    encoders = [parts[1] for parts in (line.split() for line in lines[start:])
+                if len(parts) >= 2 and parts[0].startswith('V')]
+    return path, tuple(encoders)
+
+
+def probe_encoders(cache_path: Optional[str] = None, refresh: bool = False,
+                   ffmpeg_binary: str = 'ffmpeg') -> EncoderCapabilities:
+    """
+    Find the video encoders that work on this host, once per process
+
+    The result is kept in memory; with cache_path it is also stored as JSON and reused
+    by later processes while the OpenCV version and ffmpeg location are unchanged.
+
+    Args:
+        cache_path: Optional JSON file for the probe result
+        refresh: Probe again even if a cached result exists
+        ffmpeg_binary: ffmpeg executable name or path to look for
+
+    Returns:
+        Probed encoder capabilities
+    """
+    with _encoder_lock:
+        capabilities = _encoder_capabilities.get(ffmpeg_binary)
+        if capabilities is not None and not refresh:
+            return capabilities
+
+        if cache_path and not refresh and os.path.exists(cache_path):
+            try:
+                with open(cache_path) as f:
+                    cached = EncoderCapabilities.from_dict(json.load(f))
+                if (cached.opencv_version == cv2.__version__
+                        and cached.ffmpeg_binary == shutil.which(ffmpeg_binary)):
+                    _encoder_capabilities[ffmpeg_binary] = cached
+                    return cached
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Ignoring unreadable encoder cache {cache_path}: {e}")
+
+        ffmpeg_path, ffmpeg_encoders = _probe_ffmpeg(ffmpeg_binary)
+        capabilities = EncoderCapabilities(
+            opencv_version=cv2.__version__,
+            fourccs=_probe_fourccs(),
+            ffmpeg_binary=ffmpeg_path,
+            ffmpeg_encoders=ffmpeg_encoders,
+            probed_at=time.time()
+        )
+        _encoder_capabilities[ffmpeg_binary] = capabilities
+        logger.info(f"Encoder probe: OpenCV codecs {list(capabilities.fourccs)}, "
+                    f"ffmpeg {'at ' + ffmpeg_path if ffmpeg_path else 'not found'}")
+
+        if cache_path:
+            try:
+                directory = os.path.dirname(os.path.abspath(cache_path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(capabilities.to_dict(), f, indent=2)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not write encoder cache {cache_path}: {e}")
+
+        return capabilities
+
+
+def _open_video_writer(output_path: str, fps: float, size: Tuple[int, int],
+                       ffmpeg: Optional[FFmpegSettings] = None) -> Tuple[Optional[Any], Optional[str], Optional[str]]:
+    """
+    Open a writer with the best probed encoder; returns (writer, filename, codec)
+
+    With ffmpeg settings the ffmpeg backend is used when the probe found it and its
+    codec; otherwise the working cv2.VideoWriter codecs are tried in order of preference.
+    """
+    if ffmpeg is not None and not probe_encoders(ffmpeg_binary=ffmpeg.binary).supports_ffmpeg(ffmpeg.codec):
+        logger.warning(f"ffmpeg with encoder '{ffmpeg.codec}' is not available, using OpenCV codecs")
+        ffmpeg = None
+
+    if ffmpeg is not None:
+        writer = FFmpegWriter(output_path, fps, size, ffmpeg)
+        if writer.isOpened():
+            logger.info(f"Using ffmpeg encoder: {ffmpeg.codec}, output: {output_path}")
+            return writer, output_path, FFMPEG_CODEC
+        writer.release()
+        logger.warning("ffmpeg encoder unavailable, falling back to OpenCV codecs")
+
+    # If the probe found nothing (e.g. no writable temp dir), still try every codec
+    working = probe_encoders().fourccs
+    codecs = [(codec_name, _codec_filename(output_path, ext)) for codec_name, ext in VIDEO_CODECS
+              if codec_name in working or not working]
+
+    for codec_name, filename in codecs:
+        try:
+            fourcc = cv2.VideoWriter_fourcc(*codec_name)
+            out = cv2.VideoWriter(filename, fourcc, fps, size)
+            if out.isOpened():
+                logger.info(f"Using codec: {codec_name}, output: {filename}")
+                return out, filename, codec_name
+            out.release()
+        except Exception as e:
+            logger.warning(f"Codec {codec_name} failed: {e}")
+
+    return None, None, None
+
+
+# Segments shorter than this are not worth a process of their own
+MIN_SEGMENT_FRAMES = 30
+
+
+def _segment_count(processes: int, total_frames: int) -> int:
+    """Number of frame-range segments to render in parallel"""
+    if processes == 1 or total_frames <= 0:
+        return 1
+    if processes <= 0:
+        processes = os.cpu_count() or 1
+    return max(1, min(processes, total_frames // MIN_SEGMENT_FRAMES))
+
+
+def _open_at_frame(video_path: str, start: int) -> cv2.VideoCapture:
+    """Open a capture positioned exactly at frame start"""
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) != start:
+            # Inaccurate seek (common with MP4): reopen and skip frames without decoding them
+            cap.release()
+            cap = cv2.VideoCapture(video_path)
+            for _ in range(start):
+                if not cap.grab():
+                    break
+    return cap
+
+
+def _render_segment(video_path: str, segment_path: str, codec_name: str, fps: float,
+                    settings: Dict[str, Any], start: int, count: Optional[int],
+                    dedup_threshold: Optional[float] = None,
+                    ffmpeg: Optional[FFmpegSettings] = None,
+                    counters: Optional[Any] = None, index: int = 0) -> Tuple[int, int]:
+    """
+    Render frames [start, start + count) of a video into its own file (runs in a worker process)
+
+    count=None renders until the end of the video. When counters (a Manager dict) is given,
+    counters[index] follows the frames written so the parent can report progress.
+    Returns (frames written, duplicate frames).
+    """
+    engine = HologramEngine(**settings)
+    dedup = FrameDeduplicator(dedup_threshold) if dedup_threshold is not None else None
+    cap = _open_at_frame(video_path, start)
+    writer = None
+    canvas = None
+    written = 0
+
+    try:
+        while count is None or written < count:
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                break
+
+            if writer is None:
+                canvas = engine.new_canvas(frame.shape, frame.dtype)
+                writer = _create_writer(segment_path, codec_name, fps, (canvas.shape[1], canvas.shape[0]), ffmpeg)
+                if not writer.isOpened():
+                    raise RuntimeError(f"Could not open segment writer for {segment_path}")
+
+            if dedup is None or not dedup.is_duplicate(frame):
+                engine.compose(frame, out=canvas)
+            writer.write(canvas)
+            written += 1
+            if counters is not None and written % 10 == 0:
+                counters[index] = written
+    finally:
+        cap.release()
+        if writer is not None:
+            writer.release()
+
+    return written, dedup.hits if dedup is not None else 0
+
+
+def _join_segments(segment_paths: List[str], output_file: str, codec_name: str,
+                   fps: float, size: Tuple[int, int], ffmpeg: Optional[FFmpegSettings] = None) -> bool:
+    """Concatenate rendered segments into output_file, losslessly with ffmpeg when available"""
+    binary = shutil.which(ffmpeg.binary if ffmpeg is not None else 'ffmpeg')
+    if binary:
+        list_path = f"{output_file}.segments.txt"
+        try:
+            with open(list_path, 'w') as f:
+                for path in segment_paths:
+                    escaped = os.path.abspath(path).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            result = subprocess.run(
+                [binary, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                 '-i', list_path, '-c', 'copy', output_file],
+                capture_output=True
+            )
+            if result.returncode == 0:
+                return True
+            logger.warning(f"ffmpeg concat failed, re-encoding segments: {result.stderr.decode().strip()}")
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+    else:
+        logger.info("ffmpeg not found, joining segments by re-encoding")
+
+    writer = _create_writer(output_file, codec_name, fps, size, ffmpeg)
+    if not writer.isOpened():
+        return False
+    try:
+        for path in segment_paths:
+            cap = cv2.VideoCapture(path)
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                writer.write(frame)
+            cap.release()
+    finally:
+        writer.release()
+    return True
+
+
+def _run_segmented(video_path: str, output_file: str, codec_name: str, fps: float,
+                   engine: HologramEngine, start: int, total_frames: int, segments: int,
+                   dedup: Optional[FrameDeduplicator] = None,
+                   ffmpeg: Optional[FFmpegSettings] = None,
+                   progress: Optional[ProgressTracker] = None) -> int:
+    """
+    Render frame ranges in parallel processes and join them in order
+
+    Returns frames written, or -1 if a segment or the join failed. Each segment runs its
+    own duplicate detection; the hits are added to dedup. With progress, segments publish
+    their frame counts through a Manager dict that is polled here.
+    """
+    bounds = np.linspace(start, total_frames, segments + 1).astype(int)
+    root, ext = os.path.splitext(output_file)
+    segment_paths = [f"{root}.part{i:03d}{ext}" for i in range(segments)]
+    logger.info(f"Rendering {total_frames - start} frames in {segments} segments")
+
+    manager = multiprocessing.Manager() if progress is not None else None
+    try:
+        counters = manager.dict() if manager is not None else None
+        with ProcessPoolExecutor(max_workers=segments) as executor:
+            futures = [
+                executor.submit(_render_segment, video_path, segment_paths[i], codec_name, fps,
+                                engine.settings, int(bounds[i]),
+                                # The last segment runs to the end, in case the frame count is low
+                                None if i == segments - 1 else int(bounds[i + 1] - bounds[i]),
+                                dedup.threshold if dedup is not None else None, ffmpeg, counters, i)
+                for i in range(segments)
+            ]
+            if progress is not None:
+                pending = futures
+                while pending:
+                    _, pending = wait(pending, timeout=progress.interval, return_when=FIRST_EXCEPTION)
+                    progress.update(sum(counters.values()))
+            counts, hits = zip(*(future.result() for future in futures))
+
+        if dedup is not None:
+            dedup.frames += sum(counts)
+            dedup.hits += sum(hits)
+
+        written = [path for path, count in zip(segment_paths, counts) if count > 0]
+        if not written:
+            return 0
+
+        cap = cv2.VideoCapture(written[0])
+        size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        cap.release()
+
+        if not _join_segments(written, output_file, codec_name, fps, size, ffmpeg):
+            return -1
+
+        logger.info(f"Joined segments with frame counts {list(counts)}")
+        return sum(counts)
+
+    except Exception as e:
+        logger.error(f"Segmented rendering failed: {e}")
+        return -1
+
+    finally:
+        if manager is not None:
+            manager.shutdown()
+        for path in segment_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def process_video_hologram(video_path: str, output_path: str, batch_size: int = 8,
+                           memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                           engine: Optional[HologramEngine] = None,
+                           workers: int = 0, queue_size: Optional[int] = None,
+                           processes: int = 1,
+                           dedup_threshold: Optional[float] = None,
+                           ffmpeg: Optional[FFmpegSettings] = None,
+                           progress: Optional[Callable[[VideoProgress], None]] = None,
+                           progress_interval: float = 0.5) -> Optional[VideoJobSummary]:
     """
     Process video file and create hologram effect for each frame
     Adapted from 3DHologram.py process_video function
 
+    By default frames are decoded in chunks and composed with HologramEngine.compose_batch
+    on the calling thread. With workers > 0, decoding, composition and encoding run as a
+    threaded pipeline connected by bounded queues; frame order is preserved. With
+    processes != 1, frame ranges are rendered in separate processes and joined afterwards.
+
+    With dedup_threshold set, frames that repeat the last composed frame (see
+    FrameDeduplicator) reuse its hologram instead of being composed again.
+
     Args:
         video_path: Path to input video
         output_path: Path for output video
+        batch_size: Frames decoded and composed per chunk (serial mode)
+        memory_budget: Upper bound in bytes for the chunk's frame and canvas buffers (serial mode)
+        engine: Engine holding the hologram settings and compose mode (default: frames
+            stretched to VIDEO_FRAME_SIZE and scaled by 0.5 in a single resample)
+        workers: Compositor threads for the pipelined mode, 0 to run serially
+        queue_size: Frames buffered between pipeline stages (default: 2 * workers)
+        processes: Segment processes for long videos, 0 for one per CPU core
+        dedup_threshold: None to compose every frame, 0 to reuse holograms of exactly
+            repeated frames, > 0 for near-duplicates within that mean pixel difference
+        ffmpeg: Encode through an ffmpeg process with these settings, falling back to
+            cv2.VideoWriter codecs when ffmpeg is unavailable
+        progress: Called with a VideoProgress (frames done, total, fps, ETA) at most
+            every progress_interval seconds, and once more when the job finishes
+        progress_interval: Minimum seconds between progress callbacks
 
     Returns:
-        Success status
+        Job summary (output file, frame and duplicate counts), or None on failure
     """
+    start_time = time.time()
     try:
         logger.info(f"Processing video hologram: {video_path} -> {output_path}")
 
@@ -130,7 +1482,7 @@ def process_video_hologram(video_path: str, output_path: str) -> bool:
 
         if not cap.isOpened():
             logger.error(f"Failed to open video file: {video_path}")
-            return False
+            return None
 
         # Get video properties
         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -143,96 +1495,308 @@ def process_video_hologram(video_path: str, output_path: str) -> bool:
 
         logger.info(f"Video properties: {width}x{height}, {fps} FPS, {total_frames} frames")
 
-        # Try to read first valid frame
-        holo = None
+        # Layout plans are built once and reused for every frame
+        if engine is None:
+            engine = HologramEngine(frame_size=VIDEO_FRAME_SIZE, aspect='stretch')
+
+        # Read first valid frame; it becomes frame 0 of the output, so there is no seek back
+        frame = None
         first_frame_attempts = 0
         max_attempts = 100
 
-        while holo is None and first_frame_attempts < max_attempts:
-            ret, frame = cap.read()
+        while frame is None and first_frame_attempts < max_attempts:
+            ret, decoded = cap.read()
             first_frame_attempts += 1
 
-            if ret and frame is not None:
-                try:
-                    frame = cv2.resize(frame, (640, 640), interpolation=cv2.INTER_CUBIC)
-                    holo = makeHologram(frame)
-                    logger.info(f"Successfully read first frame after {first_frame_attempts} attempts")
-                except Exception as e:
-                    logger.warning(f"Error processing frame {first_frame_attempts}: {e}")
-                    continue
+            if ret and decoded is not None:
+                frame = decoded
+                logger.info(f"Successfully read first frame after {first_frame_attempts} attempts")
 
-        if holo is None:
+        if frame is None:
             logger.error("Could not read any valid frames from video")
             cap.release()
-            return False
-
-        # Reset video to beginning
-        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            return None
 
-        # Define codec and create VideoWriter
-        codecs = [
-            ('mp4v', output_path),
-            ('XVID', output_path.replace('.mp4', '.avi')),
-            ('H264', output_path),
-            ('MJPG', output_path.replace('.mp4', '.avi'))
-        ]
+        if (width, height) != (frame.shape[1], frame.shape[0]):
+            logger.warning(f"Stream reports {width}x{height} but frames decode as "
+                           f"{frame.shape[1]}x{frame.shape[0]}, using the decoded size")
 
-        out = None
-        output_file = None
+        # Output geometry comes from the layout plan; no frame is composed just to measure it
+        canvas_shape = engine.plan_for(frame.shape).canvas_shape
 
-        for codec_name, filename in codecs:
-            try:
-                fourcc = cv2.VideoWriter_fourcc(*codec_name)
-                out = cv2.VideoWriter(filename, fourcc, fps, (holo.shape[1], holo.shape[0]))
-                if out.isOpened():
-                    output_file = filename
-                    logger.info(f"Using codec: {codec_name}, output: {filename}")
-                    break
-                else:
-                    out.release()
-            except Exception as e:
-                logger.warning(f"Codec {codec_name} failed: {e}")
+        # Define codec and create VideoWriter
+        out, output_file, codec_name = _open_video_writer(output_path, fps, (canvas_shape[1], canvas_shape[0]), ffmpeg)
 
-        if out is None or not out.isOpened():
+        if out is None:
             logger.error("Could not initialize video writer with any codec")
             cap.release()
-            return False
-
-        # Process video frames
-        count = 0
-        processed = 0
+            return None
 
         logger.info("Starting video processing...")
+        dedup = FrameDeduplicator(dedup_threshold) if dedup_threshold is not None else None
+        # Frames before the first decodable one are never written
+        tracker = (ProgressTracker(progress, total_frames - (first_frame_attempts - 1), progress_interval)
+                   if progress is not None else None)
 
-        while True:
-            ret, frame = cap.read()
-            count += 1
-
-            if not ret or frame is None:
-                if count < 10:
-                    logger.warning(f"Video ended unexpectedly at frame {count}")
-                break
-
-            try:
-                frame = cv2.resize(frame, (640, 640), interpolation=cv2.INTER_CUBIC)
-                holo = makeHologram(frame)
-                out.write(holo)
-                processed += 1
-
-                if processed % 10 == 0:
-                    logger.info(f"Processed: {processed} frames")
-
-            except Exception as e:
-                logger.warning(f"Error processing frame {count}: {e}")
-                continue
+        segments = _segment_count(processes, total_frames)
+        if segments > 1:
+            # Segments render in their own processes; this process only joins them
+            out.abort() if isinstance(out, FFmpegWriter) else out.release()
+            processed = _run_segmented(video_path, output_file, codec_name, fps, engine,
+                                       first_frame_attempts - 1, total_frames, segments, dedup, ffmpeg,
+                                       tracker)
+        elif workers > 0:
+            processed = _run_pipelined(cap, out, engine, frame, workers, queue_size or 2 * workers,
+                                       dedup, tracker)
+        else:
+            batch_size = max(1, min(batch_size, engine.batch_size_for(frame.shape, memory_budget)))
+            processed = _run_batched(cap, out, engine, frame, first_frame_attempts, batch_size,
+                                     dedup, tracker)
 
         # Release resources
         cap.release()
         out.release()
 
+        if processed < 0:
+            logger.error("Segmented rendering failed")
+            return None
+        if isinstance(out, FFmpegWriter) and out.returncode:
+            logger.error(f"Encoding {output_file} failed")
+            return None
+
+        summary = VideoJobSummary(
+            output_file=output_file,
+            frames=processed,
+            duplicate_frames=dedup.hits if dedup is not None else 0,
+            elapsed=time.time() - start_time
+        )
         logger.info(f"Video processing complete! Frames processed: {processed}")
-        return True
+        if dedup is not None:
+            logger.info(f"Duplicate frames reused: {summary.duplicate_frames} ({summary.hit_rate:.1%})")
+        if tracker is not None:
+            tracker.update(processed, force=True)
+        return summary
 
     except Exception as e:
         logger.error(f"Error processing video hologram: {e}")
-        return False
\ No newline at end of file
+        return None
+
+def read_media_shape(path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    (height, width, channels) of an image or video's frames without decoding pixels
+    where possible; None if the file cannot be read
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if capture.isOpened() and capture.get(cv2.CAP_PROP_FRAME_COUNT) > 1:
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            if width > 0 and height > 0:
+                return (height, width, 3)
+    finally:
+        capture.release()
+
+    try:
+        from PIL import Image  # Reads only the header
+        with Image.open(path) as image:
+            return (image.height, image.width, 3)
+    except ImportError:
+        image = cv2.imread(path)
+        return image.shape[:2] + (3,) if image is not None else None
+    except Exception:
+        return None
+
+
+def estimate_job_memory(frame_shape: Tuple[int, ...], settings: Optional[Dict[str, Any]] = None,
+                        video: bool = False, frames_in_flight: int = 8) -> int:
+    """
+    Rough peak bytes for composing frames of frame_shape with the given settings
+
+    Counts the decoded frame, the scaled frame and the canvas, which grows with scaleR
+    squared; video jobs are normalized to VIDEO_FRAME_SIZE and keep frames_in_flight
+    frames and canvases at once (the default chunk size of the batched path).
+    """
+    engine = HologramEngine(frame_size=VIDEO_FRAME_SIZE if video else None, **(settings or {}))
+    plan = engine.plan_for(tuple(frame_shape))
+    channels = frame_shape[2] if len(frame_shape) > 2 else 1
+    frame_bytes = int(np.prod(frame_shape))
+    scaled_bytes = plan.view_size[0] * plan.view_size[1] * channels
+    canvas_bytes = int(np.prod(plan.canvas_shape))
+
+    if video:
+        return frames_in_flight * (frame_bytes + canvas_bytes) + scaled_bytes
+    # The canvas is held once more while it is encoded
+    return frame_bytes + scaled_bytes + 2 * canvas_bytes
+
+
+def fit_pixel_budget(frame_shape: Tuple[int, ...], max_pixels: int, scale: float = 0.5,
+                     scaleR: int = 4, distance: int = 0,
+                     frame_size: Optional[Tuple[int, int]] = None,
+                     fixed_scaleR: bool = False, even: bool = False) -> Dict[str, Any]:
+    """
+    Settings whose hologram canvas has at most max_pixels pixels
+
+    Settings that already fit are returned unchanged; nothing is ever scaled up. Unless
+    fixed_scaleR, the canvas multiplier is first lowered towards the tightest layout in
+    which the four views still do not overlap, since that only removes black border.
+    If the canvas is still too big, scale is lowered to fit.
+
+    Args:
+        frame_shape: Shape of the input frames (height, width[, channels])
+        max_pixels: Largest canvas, in pixels (the canvas is square)
+        scale, scaleR, distance: Requested settings
+        frame_size: Frame size the engine normalizes to, as in build_layout_plan
+        fixed_scaleR: Keep scaleR as given and only lower scale
+        even: Keep the canvas side even, as yuv420p video encoders require
+
+    Returns:
+        {'scale', 'scaleR', 'distance'} for HologramEngine / makeHologram
+    """
+    def side(scale: float, scaleR: int) -> int:
+        return build_layout_plan(frame_shape[:2], scale, scaleR, distance, frame_size).canvas_shape[0]
+
+    def fits(scale: float, scaleR: int) -> bool:
+        canvas = side(scale, scaleR)
+        return canvas * canvas <= max_pixels and not (even and canvas % 2)
+
+    if fits(scale, scaleR):
+        return {'scale': scale, 'scaleR': scaleR, 'distance': distance}
+
+    base_w, base_h = frame_size if frame_size else (frame_shape[1], frame_shape[0])
+    if not fixed_scaleR:
+        # Views do not overlap while the canvas spans two view heights plus a view width
+        view_h, view_w = int(scale * base_h), int(scale * base_w)
+        tightest = math.ceil((2 * min(view_h, view_w) + max(view_h, view_w)) / max(view_h, view_w))
+        scaleR = max(1, min(scaleR, tightest))
+        if fits(scale, scaleR):
+            return {'scale': scale, 'scaleR': scaleR, 'distance': distance}
+
+    # Largest view edge whose canvas fits, then the scale that produces it
+    view_edge = min(int(scale * max(base_w, base_h)), (math.isqrt(max_pixels) - distance) // scaleR)
+    while view_edge > 0:
+        fitted = view_edge / max(base_w, base_h)
+        if int(fitted * min(base_w, base_h)) > 0 and fits(fitted, scaleR):
+            return {'scale': fitted, 'scaleR': scaleR, 'distance': distance}
+        view_edge -= 1
+    raise ValueError(f"No hologram of {frame_shape[:2]} frames fits in {max_pixels} pixels")
+
+
+# ==============================================================================
+# JOB ENTRY POINTS
+# Top-level so worker process pools can pickle them; everything they need is passed
+# as plain data (settings dicts, paths, queue proxies)
+# ==============================================================================
+
+def render_image_file(input_path: str, output_path: str,
+                      settings: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Read an image, create its hologram and write it
+
+    Args:
+        input_path: Image to read
+        output_path: File to write, format chosen by its extension
+        settings: makeHologram keyword arguments (scale, scaleR, distance)
+
+    Returns:
+        Path of the written hologram
+    """
+    original = cv2.imread(input_path)
+    if original is None:
+        raise ValueError(f"Could not read image: {input_path}")
+
+    hologram = makeHologram(original, **(settings or {}))
+    if not cv2.imwrite(output_path, hologram):
+        raise IOError(f"Could not write hologram: {output_path}")
+    return output_path
+
+
+class ImageTooLargeError(ValueError):
+    """An image has more pixels than the caller allows"""
+
+
+def image_bytes_shape(data: bytes) -> Optional[Tuple[int, int]]:
+    """(height, width) from an encoded image's header, None without PIL or on failure"""
+    try:
+        from PIL import Image
+        with Image.open(io.BytesIO(data)) as image:
+            return (image.height, image.width)
+    except Exception:
+        return None
+
+
+def render_image_bytes(data: bytes, image_format: str = 'png',
+                       settings: Optional[Dict[str, Any]] = None,
+                       quality: Optional[int] = None, max_pixels: Optional[int] = None) -> bytes:
+    """
+    Create the hologram of an encoded image entirely in memory
+
+    Args:
+        data: Encoded image (anything cv2.imdecode reads)
+        image_format: Output encoding, a key of IMAGE_ENCODINGS
+        settings: makeHologram keyword arguments (scale, scaleR, distance)
+        quality: JPEG/WebP quality 1-100 (ignored for PNG); None keeps OpenCV's default
+        max_pixels: Refuse larger images with ImageTooLargeError, checked from the
+            header before decoding when PIL is available
+
+    Returns:
+        The encoded hologram
+    """
+    if image_format not in IMAGE_ENCODINGS:
+        raise ValueError(f"image_format must be one of {sorted(IMAGE_ENCODINGS)}, got '{image_format}'")
+    extension, quality_flag = IMAGE_ENCODINGS[image_format]
+
+    if max_pixels is not None:
+        shape = image_bytes_shape(data)
+        if shape is not None and shape[0] * shape[1] > max_pixels:
+            raise ImageTooLargeError(f"Image is {shape[1]}x{shape[0]}, over the {max_pixels} pixel limit")
+
+    original = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if original is None:
+        raise ValueError("Could not decode image")
+    if max_pixels is not None and original.shape[0] * original.shape[1] > max_pixels:
+        raise ImageTooLargeError(f"Image is {original.shape[1]}x{original.shape[0]}, "
+                                 f"over the {max_pixels} pixel limit")
+
+    hologram = makeHologram(original, **(settings or {}))
+    params = [quality_flag, quality] if quality_flag is not None and quality is not None else []
+    ok, encoded = cv2.imencode(extension, hologram, params)
+    if not ok:
+        raise ValueError(f"Could not encode hologram as {image_format}")
+    return encoded.tobytes()
+
+
+def _queue_progress(progress_queue: Any, tag: Any, progress: VideoProgress):
+    """Progress callback forwarding (tag, progress) to a queue shared with the parent"""
+    progress_queue.put((tag, progress))
+
+
+def render_video_file(input_path: str, output_path: str,
+                      settings: Optional[Dict[str, Any]] = None,
+                      progress_queue: Optional[Any] = None, tag: Any = None,
+                      **options) -> VideoJobSummary:
+    """
+    Create the hologram video for a file, for use from worker pools
+
+    Frames are normalized to VIDEO_FRAME_SIZE like the CLI video path. Progress is
+    reported as (tag, VideoProgress) items on progress_queue, which may be a
+    queue.Queue or a multiprocessing Manager queue.
+
+    Args:
+        input_path: Video to read
+        output_path: Requested output path (the codec fallback may change the extension)
+        settings: HologramEngine keyword arguments (scale, scaleR, distance, ...)
+        progress_queue: Optional queue receiving progress updates
+        tag: Identifies this job in progress items
+        **options: Further process_video_hologram arguments
+
+    Returns:
+        Job summary, including the real output file
+    """
+    engine = HologramEngine(frame_size=VIDEO_FRAME_SIZE, **(settings or {}))
+    if progress_queue is not None:
+        options['progress'] = partial(_queue_progress, progress_queue, tag)
+
+    summary = process_video_hologram(input_path, output_path, engine=engine, **options)
+    if summary is None:
+        raise RuntimeError(f"Video hologram generation failed: {input_path}")
+    return summary
@@ -185,17 +185,19 @@ class HoloVoiceApp {
 
         // Determine file type and create appropriate element
         const isVideo = outputFile.toLowerCase().endsWith('.mp4') || outputFile.toLowerCase().endsWith('.avi');
+        // Served by /download for byte ranges (video seeking) and revalidation; the
+        // server sends the real media type
+        const previewUrl = `/download/${this.currentJobId}?inline=true`;
 
         if (isVideo) {
             resultContainer.innerHTML = `
-                <video controls class="hologram-result">
-                    <source src="/outputs/${outputFile.split('/').pop()}" type="video/mp4">
+                <video controls class="hologram-result" src="${previewUrl}">
                     Your browser does not support video playback.
                 </video>
             `;
         } else {
             resultContainer.innerHTML = `
-                <img src="/outputs/${outputFile.split('/').pop()}" alt="Generated Hologram" class="hologram-result hologram-effect">
+                <img src="${previewUrl}" alt="Generated Hologram" class="hologram-result hologram-effect">
             `;
         }
 
@@ -0,0 +1,39 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+import pytest_asyncio
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Importing web_app opens its job database and creates uploads/ and outputs/ in the
+# working directory, and mounts static/ and templates/ from it. Run from a scratch
+# directory that links to the repository's assets, so tests never touch the checkout
+WORK_DIR = tempfile.mkdtemp(prefix='holovoice-tests-')
+for name in ('static', 'templates'):
+    os.symlink(os.path.join(ROOT, name), os.path.join(WORK_DIR, name))
+os.chdir(WORK_DIR)
+atexit.register(shutil.rmtree, WORK_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    """AppConfig with every path under tmp_path and a single thread worker"""
+    from web_app import AppConfig
+    return AppConfig(upload_dir=str(tmp_path / 'uploads'), output_dir=str(tmp_path / 'outputs'),
+                     job_db_path=str(tmp_path / 'jobs.db'), encoder_cache_path=None,
+                     worker_pool='thread', max_workers=1)
+
+
+@pytest_asyncio.fixture
+async def processor(app_config):
+    """HologramProcessor for app_config, shut down after the test"""
+    from web_app import HologramProcessor
+    processor = HologramProcessor(app_config)
+    yield processor
+    processor.shutdown()
+    await processor.close_store()
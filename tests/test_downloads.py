@@ -0,0 +1,133 @@
+import hashlib
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import web_app
+from web_app import MemoryJobStore, content_disposition, etag_matches, parse_range
+
+CONTENT = bytes(range(256)) * 4  # 1024 bytes
+ETAG = f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+
+
+def test_etag_matches_lists_and_wildcard():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('*', '"b"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_etag_matches_weak_comparison():
+    assert etag_matches('W/"b"', '"b"')
+    assert not etag_matches('W/"b"', '"b"', weak=False)
+    assert etag_matches('"b"', '"b"', weak=False)
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('bytes=0-99', (0, 99)),
+    ('bytes=100-', (100, 1023)),       # Open-ended
+    ('bytes=-100', (924, 1023)),       # Suffix
+    ('bytes=-5000', (0, 1023)),        # Suffix longer than the file
+    ('bytes=1000-5000', (1000, 1023)),  # End clamped to the file
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1024) == expected
+
+
+@pytest.mark.parametrize('header', ['items=0-1', 'bytes=0-1,5-6', 'bytes=a-b', 'bytes=-'])
+def test_parse_range_ignored(header):
+    assert parse_range(header, 1024) is None
+
+
+@pytest.mark.parametrize('header', ['bytes=1024-', 'bytes=2000-3000', 'bytes=50-10', 'bytes=-0'])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(HTTPException) as error:
+        parse_range(header, 1024)
+    assert error.value.status_code == 416
+    assert error.value.headers['Content-Range'] == 'bytes */1024'
+
+
+def test_content_disposition():
+    assert content_disposition('hologram.png') == 'attachment; filename="hologram.png"'
+    header = content_disposition('全息 "a".png')
+    header.encode('latin-1')
+    assert header == ('attachment; filename="__ \\"a\\".png"; '
+                      "filename*=utf-8''%E5%85%A8%E6%81%AF%20%22a%22.png")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Client for a completed job whose output is CONTENT (without the lifespan)"""
+    output = tmp_path / 'hologram_全息.png'
+    output.write_bytes(CONTENT)
+    jobs = MemoryJobStore()
+    jobs.create('job', {'status': 'completed', 'output_file': str(output),
+                        'output_sha256': hashlib.sha256(CONTENT).hexdigest()})
+    monkeypatch.setattr(web_app.hologram_processor, 'jobs', jobs)
+    return TestClient(web_app.app)
+
+
+def test_download_full(client):
+    response = client.get('/download/job')
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers['etag'] == ETAG
+    assert response.headers['accept-ranges'] == 'bytes'
+    assert response.headers['content-type'] == 'image/png'
+    assert "filename*=utf-8''hologram_%E5%85%A8%E6%81%AF.png" in response.headers['content-disposition']
+
+
+def test_download_unknown_job(client):
+    assert client.get('/download/missing').status_code == 404
+
+
+def test_download_if_none_match(client):
+    response = client.get('/download/job', headers={'If-None-Match': ETAG})
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == ETAG
+    assert client.get('/download/job', headers={'If-None-Match': f'W/{ETAG}'}).status_code == 304
+    assert client.get('/download/job', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=10-19', 10, 19),
+    ('bytes=1000-', 1000, 1023),
+    ('bytes=-24', 1000, 1023),
+])
+def test_download_range(client, header, start, end):
+    response = client.get('/download/job', headers={'Range': header})
+    assert response.status_code == 206
+    assert response.content == CONTENT[start:end + 1]
+    assert response.headers['content-range'] == f'bytes {start}-{end}/1024'
+    assert response.headers['content-length'] == str(end - start + 1)
+
+
+def test_download_range_unsatisfiable(client):
+    response = client.get('/download/job', headers={'Range': 'bytes=5000-'})
+    assert response.status_code == 416
+    assert response.headers['content-range'] == 'bytes */1024'
+
+
+def test_download_if_range(client):
+    # A strong match honours the range; a weak or stale ETag sends the whole file
+    response = client.get('/download/job', headers={'Range': 'bytes=0-9', 'If-Range': ETAG})
+    assert response.status_code == 206
+    for if_range in (f'W/{ETAG}', '"stale"'):
+        response = client.get('/download/job', headers={'Range': 'bytes=0-9', 'If-Range': if_range})
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+
+def test_download_head(client):
+    response = client.head('/download/job', headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.headers['content-length'] == '10'
+    assert response.content == b''
+
+
+def test_download_inline(client):
+    response = client.get('/download/job?inline=true', headers={'Range': 'bytes=0-9'})
+    assert response.status_code == 206
+    assert response.headers['content-disposition'].startswith('inline; ')
+    assert content_disposition('a.mp4', inline=True) == 'inline; filename="a.mp4"'
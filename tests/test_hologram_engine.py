@@ -0,0 +1,109 @@
+import queue
+
+import cv2
+import numpy as np
+import pytest
+
+from hologram_generator import HologramEngine, makeHologram
+
+
+def reference_hologram(original, scale=0.5, scaleR=4, distance=0):
+    """makeHologram as it was before HologramEngine: every size and offset derived per call"""
+    image = cv2.resize(original, (int(scale * original.shape[1]), int(scale * original.shape[0])),
+                       interpolation=cv2.INTER_CUBIC)
+    up = image
+    down = np.rot90(image, 2)
+    right = np.rot90(image, -1)  # 90 degrees clockwise
+    left = np.rot90(image, 1)
+
+    max_height = max(view.shape[0] for view in (up, down, right, left))
+    max_width = max(view.shape[1] for view in (up, down, right, left))
+    hologram = np.zeros([max_height * scaleR + distance, max_width * scaleR + distance, 3], image.dtype)
+    center = int(hologram.shape[0] / 2)
+
+    start = max(0, center - up.shape[1] // 2 + distance)
+    end = min(hologram.shape[1], center + up.shape[1] // 2 + distance)
+    hologram[0:up.shape[0], start:end] = up
+
+    start = max(0, center - down.shape[1] // 2 + distance)
+    end = min(hologram.shape[1], center + down.shape[1] // 2 + distance)
+    hologram[hologram.shape[0] - down.shape[0]:, start:end] = down
+
+    right_x = hologram.shape[1] - right.shape[1] + distance
+    start = max(0, center - right.shape[0] // 2)
+    end = min(hologram.shape[0], start + right.shape[0])
+    hologram[start:end, right_x:right_x + right.shape[1]] = right
+
+    start = max(0, center - left.shape[0] // 2)
+    end = min(hologram.shape[0], start + left.shape[0])
+    hologram[start:end, distance:distance + left.shape[1]] = left
+    return hologram
+
+
+def random_frame(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+@pytest.mark.parametrize('shape, settings', [
+    ((64, 64, 3), {}),
+    ((48, 64, 3), {}),
+    ((64, 48, 3), {}),
+    ((60, 60, 3), {'scale': 0.3, 'scaleR': 3}),
+    ((64, 64, 3), {'scaleR': 2}),
+])
+def test_make_hologram_matches_reference(shape, settings):
+    frame = random_frame(shape)
+    hologram = makeHologram(frame, **settings)
+    expected = reference_hologram(frame, **settings)
+    assert hologram.shape == expected.shape
+    assert np.array_equal(hologram, expected)
+
+
+def test_engine_reuses_its_plan_across_frames():
+    engine = HologramEngine()
+    frames = [random_frame((64, 64, 3), seed) for seed in range(3)]
+    for frame in frames:
+        assert np.array_equal(engine.compose(frame), reference_hologram(frame))
+    assert engine.plan_for((64, 64, 3)) is engine.plan_for((64, 64, 3))
+
+    # A frame of another size gets its own plan
+    other = random_frame((48, 64, 3))
+    assert np.array_equal(engine.compose(other), reference_hologram(other))
+    assert engine.plan_for((48, 64, 3)) is not engine.plan_for((64, 64, 3))
+
+
+
+def test_compose_into_out():
+    engine = HologramEngine()
+    frames = [random_frame((64, 64, 3), seed) for seed in range(3)]
+    canvas = engine.new_canvas(frames[0].shape)
+    for frame in frames:
+        # The same canvas is rewritten each frame and matches a freshly allocated one
+        assert engine.compose(frame, out=canvas) is canvas
+        assert np.array_equal(canvas, engine.compose(frame))
+
+
+def test_compose_rejects_a_mismatched_out():
+    engine = HologramEngine()
+    frame = random_frame((64, 64, 3))
+    with pytest.raises(ValueError):
+        engine.compose(frame, out=engine.new_canvas((32, 32, 3)))
+    with pytest.raises(ValueError):
+        engine.compose(frame, out=engine.new_canvas(frame.shape, np.float32))
+
+
+def test_canvas_pool_hands_out_the_same_canvases():
+    engine = HologramEngine()
+    frame = random_frame((64, 64, 3))
+    pool = engine.canvas_pool(frame.shape, size=2)
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    assert first.shape == engine.plan_for(frame.shape).canvas_shape
+    with pytest.raises(queue.Empty):  # Both canvases are in use
+        pool.acquire(timeout=0.01)
+
+    engine.compose(frame, out=first)
+    pool.release(first)
+    assert pool.acquire(timeout=0.01) is first
+    with pytest.raises(ValueError):
+        pool.release(np.zeros((8, 8, 3), np.uint8))
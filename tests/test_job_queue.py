@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from web_app import JobQueue
+
+MIB = 2 ** 20
+
+
+def make_queue(image=1, video=1, max_queued=4, memory_budget=100 * MIB):
+    return JobQueue({'image': image, 'video': video}, max_queued, memory_budget)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_up_to_the_limit_then_wait_in_order():
+    jobs = make_queue(image=2)
+    for job_id in ('a', 'b', 'c', 'd'):
+        jobs.admit(job_id, 'image', MIB)
+
+    assert jobs.waiting('image') == ['c', 'd']
+    assert [jobs.position(job_id) for job_id in 'abcd'] == [None, None, 1, 2]
+    await asyncio.wait_for(jobs.acquire('a', 'image'), 1)  # Already running
+
+    waiter = asyncio.create_task(jobs.acquire('c', 'image'))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    jobs.release('a')
+    await asyncio.wait_for(waiter, 1)
+    assert jobs.waiting('image') == ['d']
+    assert jobs.position('d') == 1
+    assert jobs.admitted() == {'b', 'c', 'd'}
+
+
+@pytest.mark.asyncio
+async def test_kinds_have_separate_slots():
+    jobs = make_queue()
+    jobs.admit('image', 'image', MIB)
+    jobs.admit('video', 'video', MIB)
+    stats = jobs.stats()
+    assert stats['jobs']['image']['running'] == 1
+    assert stats['jobs']['video']['running'] == 1
+    assert stats['queued'] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_retry_after():
+    jobs = make_queue(max_queued=2)
+    for job_id in ('running', 'a', 'b'):
+        jobs.admit(job_id, 'video', MIB)
+
+    with pytest.raises(HTTPException) as error:
+        jobs.admit('c', 'video', MIB)
+    assert error.value.status_code == 429
+    # Two waiting jobs plus this one, at the default video duration
+    assert error.value.headers['Retry-After'] == str(3 * int(JobQueue.DEFAULT_DURATION['video']))
+    assert jobs.rejected == 1
+    assert 'c' not in jobs.admitted()
+
+
+@pytest.mark.asyncio
+async def test_memory_budget():
+    jobs = make_queue(image=4, memory_budget=10 * MIB)
+    with pytest.raises(HTTPException) as error:
+        jobs.admit('huge', 'image', 11 * MIB)
+    assert error.value.status_code == 413
+
+    jobs.admit('a', 'image', 6 * MIB)
+    with pytest.raises(HTTPException) as error:
+        jobs.admit('b', 'image', 6 * MIB)
+    assert error.value.status_code == 429
+    assert jobs.reserved_bytes == 6 * MIB
+
+    jobs.release('a')
+    jobs.admit('b', 'image', 6 * MIB)
+    assert jobs.reserved_bytes == 6 * MIB
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    jobs = make_queue()
+    jobs.admit('running', 'image', MIB)
+    jobs.admit('waiting', 'image', 2 * MIB)
+    waiter = asyncio.create_task(jobs.acquire('waiting', 'image'))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert jobs.waiting('image') == []
+    assert jobs.reserved_bytes == MIB
+
+
+@pytest.mark.asyncio
+async def test_unadmitted_jobs_queue_without_a_reservation():
+    jobs = make_queue()
+    jobs.admit('running', 'image', MIB)
+    waiter = asyncio.create_task(jobs.acquire('cache-miss', 'image'))
+    await asyncio.sleep(0)
+    assert jobs.position('cache-miss') == 1
+    assert jobs.reserved_bytes == MIB
+
+    jobs.release('running')
+    await asyncio.wait_for(waiter, 1)
+    jobs.release('cache-miss')
+    assert jobs.admitted() == set()
+
+
+@pytest.mark.asyncio
+async def test_try_start_never_waits():
+    jobs = JobQueue({'image': 1, 'video': 1, 'inline': 2}, 4, 10 * MIB)
+    jobs.try_start('a', 'inline', MIB)
+    jobs.try_start('b', 'inline', MIB)
+    with pytest.raises(HTTPException) as error:
+        jobs.try_start('c', 'inline', MIB)
+    assert error.value.status_code == 429
+    assert 'Retry-After' in error.value.headers
+
+    jobs.release('a')
+    jobs.try_start('c', 'inline', MIB)
+    # Inline renders share the memory budget with queued jobs
+    with pytest.raises(HTTPException) as error:
+        jobs.admit('big', 'image', 9 * MIB)
+    assert error.value.status_code == 429
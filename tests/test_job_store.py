@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from web_app import MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    store = MemoryJobStore() if request.param == 'memory' else SQLiteJobStore(str(tmp_path / 'jobs.db'))
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    fields = {'status': 'queued', 'progress': 0, 'settings': {'scale': 0.5, 'scaleR': 4}}
+    store.create('a', fields)
+    assert store.get('a') == fields
+    assert store.get('missing') is None
+
+    # Callers get copies; only update() changes the stored job
+    store.get('a')['status'] = 'changed'
+    fields['status'] = 'changed'
+    assert store.get('a')['status'] == 'queued'
+
+    job = store.update('a', {'status': 'processing', 'progress': 40})
+    assert job == {'status': 'processing', 'progress': 40, 'settings': {'scale': 0.5, 'scaleR': 4}}
+    assert store.get('a') == job
+    assert store.update('missing', {'status': 'failed'}) is None
+
+
+def test_list_by_status_most_recent_first(store):
+    for job_id in ('a', 'b', 'c'):
+        store.create(job_id, {'status': 'queued'})
+        time.sleep(0.01)
+    store.update('a', {'status': 'processing'})
+    time.sleep(0.01)
+    store.update('b', {'progress': 10})
+
+    assert [job['job_id'] for job in store.list()] == ['b', 'a', 'c']
+    assert [job['job_id'] for job in store.list('queued')] == ['b', 'c']
+    assert [job['job_id'] for job in store.list(limit=1)] == ['b']
+
+
+def test_sqlite_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = SQLiteJobStore(path)
+    store.create('a', {'status': 'completed', 'output_file': 'outputs/hologram_a.png'})
+    store.close()
+
+    store = SQLiteJobStore(path)
+    assert store.get('a') == {'status': 'completed', 'output_file': 'outputs/hologram_a.png'}
+    assert store.list('completed')[0]['job_id'] == 'a'
+    store.close()
+
+
+def dead_pid():
+    """Pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.asyncio
+async def test_recover_orphans(processor):
+    host = processor.host
+    jobs = {
+        'dead': {'status': 'processing', 'owner': {'host': host, 'pid': dead_pid()}},
+        'restarted': {'status': 'queued', 'owner': {'host': host, 'pid': os.getpid()}},
+        'no-owner': {'status': 'queued'},
+        'alive': {'status': 'processing', 'owner': {'host': host, 'pid': os.getppid()}},
+        'other-host': {'status': 'queued', 'owner': {'host': f'not-{host}', 'pid': 1}},
+        'completed': {'status': 'completed', 'owner': {'host': host, 'pid': dead_pid()}}
+    }
+    for job_id, job in jobs.items():
+        processor.jobs.create(job_id, job)
+
+    assert await processor.run_store(processor.recover_orphans) == 3
+    statuses = {job_id: processor.jobs.get(job_id)['status'] for job_id in jobs}
+    assert statuses == {'dead': 'failed', 'restarted': 'failed', 'no-owner': 'failed',
+                        'alive': 'processing', 'other-host': 'queued', 'completed': 'completed'}
+    assert processor.jobs.get('dead')['error'] == "Interrupted by a server restart"
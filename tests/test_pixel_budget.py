@@ -0,0 +1,50 @@
+import pytest
+
+from hologram_generator import VIDEO_FRAME_SIZE, build_layout_plan, fit_pixel_budget
+
+
+def canvas_pixels(frame_shape, settings, frame_size=None):
+    plan = build_layout_plan(frame_shape, settings['scale'], settings['scaleR'],
+                             settings['distance'], frame_size)
+    return plan.canvas_shape[0] * plan.canvas_shape[1]
+
+
+def test_settings_that_fit_are_unchanged():
+    settings = fit_pixel_budget((600, 600), 10 ** 8, scale=0.5, scaleR=4)
+    assert settings == {'scale': 0.5, 'scaleR': 4, 'distance': 0}
+
+
+def test_scale_r_is_lowered_first():
+    # 4K frame: a 1920x1080 view needs a canvas 3 views wide, not 4
+    settings = fit_pixel_budget((2160, 3840), 6000 ** 2, scale=0.5, scaleR=4)
+    assert settings == {'scale': 0.5, 'scaleR': 3, 'distance': 0}
+    assert canvas_pixels((2160, 3840), settings) <= 6000 ** 2
+
+
+def test_scale_is_lowered_when_scale_r_is_not_enough():
+    max_pixels = 1920 * 1080
+    settings = fit_pixel_budget((2160, 3840), max_pixels, scale=0.5, scaleR=4)
+    assert settings['scaleR'] == 3
+    assert settings['scale'] < 0.5
+    assert canvas_pixels((2160, 3840), settings) <= max_pixels
+
+
+def test_fixed_scale_r():
+    max_pixels = 1000 ** 2
+    settings = fit_pixel_budget((600, 600), max_pixels, scale=0.5, scaleR=4, fixed_scaleR=True)
+    assert settings['scaleR'] == 4
+    assert canvas_pixels((600, 600), settings) <= max_pixels
+
+
+@pytest.mark.parametrize('distance', [0, 7])
+def test_even_video_canvas(distance):
+    settings = fit_pixel_budget((720, 1280), 900 ** 2, scale=0.5, scaleR=4, distance=distance,
+                                frame_size=VIDEO_FRAME_SIZE, even=True)
+    plan = build_layout_plan((720, 1280), settings['scale'], settings['scaleR'], distance, VIDEO_FRAME_SIZE)
+    assert plan.canvas_shape[0] % 2 == 0
+    assert plan.canvas_shape[0] * plan.canvas_shape[1] <= 900 ** 2
+
+
+def test_impossible_budget():
+    with pytest.raises(ValueError):
+        fit_pixel_budget((600, 600), 4, scale=0.5, scaleR=4)
@@ -0,0 +1,60 @@
+import asyncio
+import hashlib
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from web_app import HologramOptions
+
+
+def write_upload(app_config, job_id):
+    """Save a small PNG as the upload of job_id; returns its path and SHA-256"""
+    _, png = cv2.imencode('.png', np.full((64, 64, 3), 128, np.uint8))
+    path = os.path.join(app_config.upload_dir, f"{job_id}_logo.png")
+    with open(path, 'wb') as f:
+        f.write(png.tobytes())
+    return path, hashlib.sha256(png.tobytes()).hexdigest()
+
+
+async def render(processor, job_id, path, input_hash):
+    await processor.submit(path, job_id, input_hash)
+    return await processor.process_file(path, job_id, input_hash)
+
+
+@pytest.mark.asyncio
+async def test_repeated_upload_is_a_cache_hit(app_config, processor):
+    first = await render(processor, 'a', *write_upload(app_config, 'a'))
+    second = await render(processor, 'b', *write_upload(app_config, 'b'))
+
+    assert first['status'] == second['status'] == 'completed'
+    assert (first['cache'], second['cache']) == ('miss', 'hit')
+    assert second['output_file'] == first['output_file']
+    assert second['output_sha256'] == first['output_sha256']
+    assert processor.cache.stats()['hits'] == 1
+    assert processor.queue.admitted() == set()
+
+
+@pytest.mark.asyncio
+async def test_other_settings_are_a_miss(app_config, processor):
+    await render(processor, 'a', *write_upload(app_config, 'a'))
+    path, digest = write_upload(app_config, 'b')
+    await processor.submit(path, 'b', digest, HologramOptions.parse({'scaleR': '3'}))
+    job = await processor.process_file(path, 'b', digest)
+    assert job['cache'] == 'miss'
+    assert processor.cache.stats()['misses'] == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_one_render(app_config, processor):
+    uploads = [write_upload(app_config, job_id) for job_id in 'abc']
+    for job_id, (path, digest) in zip('abc', uploads):
+        await processor.submit(path, job_id, digest)
+    jobs = await asyncio.gather(*(processor.process_file(path, job_id, digest)
+                                  for job_id, (path, digest) in zip('abc', uploads)))
+
+    assert sorted(job['cache'] for job in jobs) == ['miss', 'shared', 'shared']
+    assert len({job['output_file'] for job in jobs}) == 1
+    stats = processor.cache.stats()
+    assert (stats['misses'], stats['shared'], stats['inflight']) == (1, 2, 0)
@@ -0,0 +1,84 @@
+import os
+import time
+import uuid
+
+import pytest
+
+from web_app import StorageJanitor
+
+HOUR = 3600
+
+
+def make_file(directory, name, size=100, age=2 * HOUR, used=None):
+    """File last modified age seconds ago and last used (atime) used seconds ago"""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    now = time.time()
+    os.utime(path, (now - (age if used is None else used), now - age))
+    return path
+
+
+@pytest.fixture
+def janitor(app_config, processor):
+    app_config.retention_seconds = HOUR
+    app_config.storage_quota_bytes = 0
+    return StorageJanitor(app_config, processor)
+
+
+@pytest.mark.asyncio
+async def test_expired_files_of_finished_jobs_are_removed(app_config, processor, janitor):
+    queued, processing, completed = (str(uuid.uuid4()) for _ in range(3))
+    processor.jobs.create(queued, {'status': 'queued'})
+    processor.jobs.create(processing, {'status': 'processing'})
+    processor.jobs.create(completed, {'status': 'completed'})
+    admitted = str(uuid.uuid4())
+    processor.queue.admit(admitted, 'image', 1)  # This worker's job, not yet in the store
+
+    kept = [
+        make_file(app_config.upload_dir, f"{queued}_logo.png"),
+        make_file(app_config.output_dir, f"hologram_logo_{processing}.mp4"),
+        make_file(app_config.upload_dir, f"{admitted}_logo.png"),
+        make_file(app_config.upload_dir, f"{uuid.uuid4()}_new.png", age=1),  # Younger than MIN_AGE
+        make_file(app_config.output_dir, f"hologram_logo_{uuid.uuid4()}.png", used=60),  # Downloaded
+    ]
+    removed = [
+        make_file(app_config.upload_dir, f"{completed}_logo.png"),
+        make_file(app_config.output_dir, f"hologram_logo_{completed}.png")
+    ]
+    processor.cache.put('key', removed[1])
+
+    stats = await janitor.sweep()
+    assert all(os.path.exists(path) for path in kept)
+    assert not any(os.path.exists(path) for path in removed)
+    assert stats['evicted'] == {'ttl': 2, 'quota': 0}
+    assert stats['reclaimed_bytes'] == 200
+    assert stats['protected_files'] == 4
+    assert processor.cache.get('key') is None
+
+
+@pytest.mark.asyncio
+async def test_quota_evicts_least_recently_downloaded(app_config, janitor):
+    app_config.retention_seconds = 0
+    app_config.storage_quota_bytes = 250
+    paths = [make_file(app_config.output_dir, f"hologram_{uuid.uuid4()}.png") for _ in range(3)]
+    StorageJanitor.touch(paths[0])  # Downloaded just now, so the newest
+
+    stats = await janitor.sweep()
+    assert [os.path.exists(path) for path in paths] == [True, False, True]
+    assert stats['evicted'] == {'ttl': 0, 'quota': 1}
+    assert stats['stored_bytes'] == 200
+
+
+@pytest.mark.asyncio
+async def test_leftover_work_directories(app_config, janitor):
+    work_dir = os.path.join(app_config.output_dir, f".work_{uuid.uuid4()}")
+    other_dir = os.path.join(app_config.output_dir, 'keep')
+    for directory in (work_dir, other_dir):
+        os.makedirs(directory)
+        make_file(directory, 'partial.mp4')
+        os.utime(directory, (time.time() - 2 * HOUR,) * 2)
+
+    await janitor.sweep()
+    assert not os.path.exists(work_dir)
+    assert os.path.exists(other_dir)
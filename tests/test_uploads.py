@@ -0,0 +1,79 @@
+import hashlib
+import os
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+import web_app
+from web_app import receive_upload
+
+BOUNDARY = 'test-boundary'
+HEADERS = {'content-type': f'multipart/form-data; boundary={BOUNDARY}'}
+
+
+def multipart_body(filename, chunks, fields=None):
+    """Multipart body with a "file" part made of chunks, yielded piece by piece"""
+    for name, value in (fields or {}).items():
+        yield (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+               f'{value}\r\n').encode()
+    yield (f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+           f'Content-Type: application/octet-stream\r\n\r\n').encode()
+    yield from chunks
+    yield f'\r\n--{BOUNDARY}--\r\n'.encode()
+
+
+@pytest.fixture
+def client(app_config, processor, monkeypatch):
+    """Client whose uploads land in a tmp_path upload_dir limited to 64 KiB (without the lifespan)"""
+    app_config.max_file_size = 64 * 1024
+    monkeypatch.setattr(web_app, 'config', app_config)
+    monkeypatch.setattr(web_app, 'hologram_processor', processor)
+    return TestClient(web_app.app)
+
+
+def test_chunked_upload_over_the_limit(client, app_config):
+    # No Content-Length, and the whole body is within the multipart overhead allowance:
+    # the file itself is caught as it streams in
+    chunks = (b'\0' * 16 * 1024 for _ in range(6))
+    response = client.post('/upload', content=multipart_body('big.png', chunks), headers=HEADERS)
+    assert response.status_code == 413
+    assert os.listdir(app_config.upload_dir) == []
+
+
+def test_declared_size_over_the_limit(client, app_config):
+    body = b''.join(multipart_body('big.png', [b'\0' * 128 * 1024]))
+    response = client.post('/upload', content=body, headers=HEADERS)
+    assert response.status_code == 413
+    assert os.listdir(app_config.upload_dir) == []
+
+
+def test_disallowed_extension(client, app_config):
+    response = client.post('/upload', content=multipart_body('notes.txt', [b'hi']), headers=HEADERS)
+    assert response.status_code == 400
+    assert os.listdir(app_config.upload_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_is_hashed_while_saved(app_config):
+    data = bytes(range(256)) * 64
+    body = b''.join(multipart_body('logo.png', [data], {'scale': '0.3'}))
+    # Small network chunks, so part headers and data straddle them
+    messages = [{'type': 'http.request', 'body': body[i:i + 7], 'more_body': True}
+                for i in range(0, len(body), 7)]
+    messages.append({'type': 'http.request', 'body': b'', 'more_body': False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/upload',
+             'headers': [(b'content-type', HEADERS['content-type'].encode())]}
+    upload = await receive_upload(Request(scope, receive), app_config.upload_dir, 'job',
+                                  app_config.max_file_size, app_config.allowed_extensions, chunk_size=1024)
+    assert upload.filename == 'logo.png'
+    assert upload.path == os.path.join(app_config.upload_dir, 'job_logo.png')
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.fields == {'scale': '0.3'}
+    with open(upload.path, 'rb') as f:
+        assert f.read() == data
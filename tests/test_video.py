@@ -0,0 +1,86 @@
+import cv2
+import numpy as np
+import pytest
+
+from hologram_generator import MIN_SEGMENT_FRAMES, FrameDeduplicator, HologramEngine, process_video_hologram
+
+SIZE = (64, 64)
+
+
+def write_clip(path, levels):
+    """MJPG clip of flat grey frames, one per level, so frames stay recognisable after encoding"""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'MJPG'), 30.0, SIZE)
+    for level in levels:
+        writer.write(np.full(SIZE[::-1] + (3,), level, np.uint8))
+    writer.release()
+
+
+def read_levels(path):
+    """Mean level of the top view of each frame of a rendered clip"""
+    cap = cv2.VideoCapture(str(path))
+    levels = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        levels.append(int(round(frame[:frame.shape[0] // 8, frame.shape[1] // 3:-frame.shape[1] // 3].mean())))
+    cap.release()
+    return levels
+
+
+@pytest.fixture
+def clip(tmp_path):
+    levels = [20 + 3 * i for i in range(2 * MIN_SEGMENT_FRAMES + 5)]  # Rising, so order shows
+    path = tmp_path / 'clip.avi'
+    write_clip(path, levels)
+    return path, levels
+
+
+def test_segments_match_the_serial_render(clip, tmp_path):
+    path, levels = clip
+    engine = HologramEngine(scale=0.5, scaleR=2, frame_size=SIZE)
+    serial = process_video_hologram(str(path), str(tmp_path / 'serial.avi'), engine=engine)
+    segmented = process_video_hologram(str(path), str(tmp_path / 'segmented.avi'), engine=engine, processes=2)
+
+    assert serial.frames == segmented.frames == len(levels)
+    serial_levels = read_levels(serial.output_file)
+    segmented_levels = read_levels(segmented.output_file)
+    assert len(serial_levels) == len(segmented_levels) == len(levels)
+    # Levels are only approximate after two lossy encodes, but every frame is at its
+    # source position: both renders rise frame by frame and agree with each other
+    for levels_read in (serial_levels, segmented_levels):
+        assert all(a < b for a, b in zip(levels_read, levels_read[1:]))
+    assert all(abs(a - b) <= 4 for a, b in zip(serial_levels, segmented_levels))
+
+
+def test_exact_dedup_only_skips_identical_frames():
+    dedup = FrameDeduplicator(threshold=0)
+    frame = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    nudged = frame.copy()
+    nudged[10, 10, 0] ^= 1  # Below what the thumbnail can see
+
+    assert not dedup.is_duplicate(frame)
+    assert dedup.is_duplicate(frame.copy())
+    assert not dedup.is_duplicate(nudged)
+    assert dedup.is_duplicate(nudged.copy())
+    assert (dedup.frames, dedup.hits) == (4, 2)
+
+
+def test_threshold_dedup_compares_against_the_last_composed_frame():
+    dedup = FrameDeduplicator(threshold=2)
+    assert not dedup.is_duplicate(np.full((64, 64, 3), 100, np.uint8))
+    # Each step is within the threshold of the previous frame, but drift is measured
+    # from the reference, so the fade is composed again once it moves far enough
+    results = [dedup.is_duplicate(np.full((64, 64, 3), 100 + step, np.uint8)) for step in range(1, 5)]
+    assert results == [True, True, False, True]
+
+
+def test_exact_dedup_in_the_pipeline(tmp_path):
+    levels = [50] * 10 + [51] + [50] * 5
+    path = tmp_path / 'static.avi'
+    write_clip(path, levels)
+    engine = HologramEngine(scale=0.5, scaleR=2, frame_size=SIZE)
+    summary = process_video_hologram(str(path), str(tmp_path / 'out.avi'), engine=engine, dedup_threshold=0)
+    assert summary.frames == len(levels)
+    assert summary.duplicate_frames > 0
+    assert summary.hit_rate == summary.duplicate_frames / summary.frames
@@ -5,25 +5,51 @@ Extracting best practices from holomind_bisa architecture
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import math
+import mimetypes
+import multiprocessing
 import os
-import subprocess
+import queue
+import re
+import shutil
+import socket
+import sqlite3
 import tempfile
+import threading
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, List, Tuple
+from urllib.parse import quote
 import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import partial
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, WebSocket
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Query
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from starlette.websockets import WebSocketState
 from fastapi import Request
 import uvicorn
+import aiofiles
 import cv2
-import numpy as np
+try:
+    import python_multipart as multipart
+except ImportError:  # python-multipart before 0.0.13
+    import multipart
+
+from hologram_generator import (
+    ENGINE_VERSION, VIDEO_FRAME_SIZE, ImageTooLargeError, VideoProgress, estimate_job_memory,
+    fit_pixel_budget, image_bytes_shape, probe_encoders, read_media_shape, render_image_bytes,
+    render_image_file, render_video_file
+)
 
 # Configure logging (following holomind_bisa patterns)
 logging.basicConfig(
@@ -43,144 +69,1397 @@ class AppConfig:
     upload_dir: str = "./uploads"
     output_dir: str = "./outputs"
     max_file_size: int = 50 * 1024 * 1024  # 50MB
+    upload_chunk_size: int = 1024 * 1024  # Bytes read, hashed and written per step when saving uploads
+    download_chunk_size: int = 256 * 1024  # Bytes per write when streaming downloads
+    download_cache_control: str = "public, max-age=3600"  # Outputs never change once published
+    # POST /hologram renders in memory and skips the job queue, so only small images qualify
+    inline_max_file_size: int = 2 * 1024 * 1024
+    inline_max_pixels: int = 1920 * 1080
+    result_cache_max_bytes: int = 1024 * 1024 * 1024  # Outputs indexed for repeated uploads, 0 disables
+    # Where job status lives: 'sqlite' survives restarts and is shared by all uvicorn
+    # workers on the host, 'memory' is per process
+    job_store: str = 'sqlite'
+    job_db_path: str = "./holovoice_jobs.db"
     allowed_extensions: List[str] = field(default_factory=lambda: ['.png', '.jpg', '.jpeg', '.avi', '.mp4'])
     hologram_settings: Dict[str, Any] = field(default_factory=lambda: {
         'scale': 0.5,
         'scaleR': 4,
         'distance': 0
     })
+    # Encoder probe results survive restarts here (None keeps them in memory only)
+    encoder_cache_path: Optional[str] = os.path.join(tempfile.gettempdir(), 'holovoice_encoders.json')
+    progress_interval: float = 0.5  # Minimum seconds between video progress updates
+    status_push_interval: float = 0.25  # Minimum seconds between WebSocket pushes per job
+    # A WebSocket with no pushes re-reads its job this often, picking up changes made by
+    # other uvicorn workers sharing the job store
+    status_refresh_interval: float = 15.0
+    # Janitor for upload_dir and output_dir: files unused for retention_seconds are
+    # deleted, and least recently downloaded ones go while the total is over
+    # storage_quota_bytes (0 disables either rule)
+    retention_seconds: float = 24 * 3600
+    storage_quota_bytes: int = 10 * 1024 * 1024 * 1024
+    janitor_interval: float = 300.0
+    # Live stream of holomind_bisa's HolographicRenderer (/live/mjpeg, /live/ws)
+    live_fps: float = 20.0
+    live_render_size: int = 512  # Square frame rendered before the 4-view projection
+    live_jpeg_quality: int = 80
+    # Hologram composition runs in this pool, never on the event loop
+    worker_pool: str = 'process'  # 'process' or 'thread'
+    max_workers: int = field(default_factory=lambda: min(4, os.cpu_count() or 1))
+    # Jobs of each type rendered at once; further admitted jobs wait in a FIFO queue.
+    # 'inline' requests (/hologram) never wait: they get 429 when their slots are taken
+    max_concurrent_jobs: Dict[str, int] = field(default_factory=lambda: {'image': 2, 'video': 1, 'inline': 2})
+    max_queued_jobs: int = 16  # Waiting jobs beyond this are refused with 429
+    # Estimated peak memory of all admitted jobs must fit here (see estimate_job_memory)
+    memory_budget: int = 2 * 1024 * 1024 * 1024
 
     def __post_init__(self):
+        if self.worker_pool not in ('process', 'thread'):
+            raise ValueError(f"worker_pool must be 'process' or 'thread', got '{self.worker_pool}'")
+        if self.max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {self.max_workers}")
+        if self.job_store not in ('sqlite', 'memory'):
+            raise ValueError(f"job_store must be 'sqlite' or 'memory', got '{self.job_store}'")
+        if set(self.max_concurrent_jobs) != {'image', 'video', 'inline'} or \
+                min(self.max_concurrent_jobs.values()) < 1:
+            raise ValueError(f"max_concurrent_jobs needs at least 1 'image', 'video' and 'inline' slot, "
+                             f"got {self.max_concurrent_jobs}")
+        if self.max_queued_jobs < 0:
+            raise ValueError(f"max_queued_jobs must not be negative, got {self.max_queued_jobs}")
+
         # Create directories if they don't exist
         Path(self.upload_dir).mkdir(exist_ok=True)
         Path(self.output_dir).mkdir(exist_ok=True)
 
 # ==============================================================================
-# HOLOGRAM PROCESSOR (integrating with existing 3DHologram.py)
+# PER-JOB SETTINGS
+# ==============================================================================
+
+# Accepted ranges of per-job overrides (inclusive)
+SETTING_LIMITS = {'scale': (0.1, 1.0), 'scaleR': (2, 8), 'distance': (0, 50)}
+MIN_OUTPUT_PIXELS = 64 * 64
+
+@dataclass
+class HologramOptions:
+    """
+    Hologram settings requested for one job; unset fields keep AppConfig.hologram_settings
+
+    With max_pixels or target_resolution set, scale (and scaleR, unless given) are
+    derived per input so the output canvas fits, see fit_pixel_budget.
+    """
+    scale: Optional[float] = None
+    scaleR: Optional[int] = None
+    distance: Optional[int] = None
+    max_pixels: Optional[int] = None  # Largest output, in pixels
+    target_resolution: Optional[Tuple[int, int]] = None  # (width, height) the output must fit in
+
+    def __post_init__(self):
+        for name, (low, high) in SETTING_LIMITS.items():
+            value = getattr(self, name)
+            if value is not None and not low <= value <= high:
+                raise ValueError(f"{name} must be between {low} and {high}, got {value}")
+        if self.max_pixels is not None and self.max_pixels < MIN_OUTPUT_PIXELS:
+            raise ValueError(f"max_pixels must be at least {MIN_OUTPUT_PIXELS}, got {self.max_pixels}")
+        if self.target_resolution is not None and min(self.target_resolution) < math.isqrt(MIN_OUTPUT_PIXELS):
+            raise ValueError(f"target_resolution must be at least {math.isqrt(MIN_OUTPUT_PIXELS)} pixels "
+                             f"each way, got {self.target_resolution}")
+
+    @classmethod
+    def parse(cls, fields: Dict[str, str]) -> 'HologramOptions':
+        """
+        Options from form fields, all optional text; target_resolution is "WIDTHxHEIGHT"
+
+        Raises:
+            ValueError: a field is not a number of the right type or is out of range
+        """
+        values: Dict[str, Any] = {}
+        for name, kind in (('scale', float), ('scaleR', int), ('distance', int), ('max_pixels', int)):
+            text = fields.get(name, '').strip()
+            if text:
+                try:
+                    values[name] = kind(text)
+                except ValueError:
+                    raise ValueError(f"{name} must be {'a number' if kind is float else 'an integer'}, "
+                                     f"got '{text}'")
+
+        target_resolution = fields.get('target_resolution', '').strip()
+        if target_resolution:
+            match = re.fullmatch(r'(\d+)\s*[xX]\s*(\d+)', target_resolution)
+            if match is None:
+                raise ValueError(f"target_resolution must look like 1920x1080, got '{target_resolution}'")
+            values['target_resolution'] = (int(match.group(1)), int(match.group(2)))
+        return cls(**values)
+
+    @property
+    def pixel_budget(self) -> Optional[int]:
+        """Largest canvas allowed by max_pixels and target_resolution (the canvas is square)"""
+        budgets = [self.max_pixels] if self.max_pixels is not None else []
+        if self.target_resolution is not None:
+            budgets.append(min(self.target_resolution) ** 2)
+        return min(budgets) if budgets else None
+
+    def resolve(self, defaults: Dict[str, Any], frame_shape: Tuple[int, ...],
+                video: bool = False) -> Dict[str, Any]:
+        """Effective makeHologram settings for frames of frame_shape (raises ValueError)"""
+        settings = dict(defaults)
+        settings.update({name: getattr(self, name) for name in SETTING_LIMITS
+                         if getattr(self, name) is not None})
+        budget = self.pixel_budget
+        if budget is None:
+            return settings
+        # Video canvases must have even sides for yuv420p encoders
+        settings.update(fit_pixel_budget(
+            frame_shape, budget, settings['scale'], settings['scaleR'], settings['distance'],
+            frame_size=VIDEO_FRAME_SIZE if video else None,
+            fixed_scaleR=self.scaleR is not None, even=video
+        ))
+        return settings
+
+# ==============================================================================
+# JOB STORE
+# ==============================================================================
+
+class JobStore(ABC):
+    """Storage for job status records (plain dicts keyed by job_id)"""
+
+    @abstractmethod
+    def create(self, job_id: str, fields: Dict[str, Any]):
+        """Add a new job"""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A copy of the job's fields, None if unknown"""
+
+    @abstractmethod
+    def update(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job; returns the updated job, None if unknown"""
+
+    @abstractmethod
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recently updated jobs, optionally with one status, each with its job_id"""
+
+    def close(self):
+        """Release resources"""
+
+class MemoryJobStore(JobStore):
+    """Per-process job store, lost on restart"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._updated: Dict[str, float] = {}
+
+    def create(self, job_id: str, fields: Dict[str, Any]):
+        self._jobs[job_id] = dict(fields)
+        self._updated[job_id] = time.time()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        self._updated[job_id] = time.time()
+        return dict(job)
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        job_ids = sorted(self._jobs, key=self._updated.get, reverse=True)
+        jobs = [dict(self._jobs[job_id], job_id=job_id) for job_id in job_ids
+                if status is None or self._jobs[job_id].get('status') == status]
+        return jobs[:limit]
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store in a SQLite database in WAL mode
+
+    Readers never block the writer, so several uvicorn workers can share one file. Jobs
+    are stored as JSON with status and update time in indexed columns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, updated_at)")
+
+    def create(self, job_id: str, fields: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, data, updated_at) VALUES (?, ?, ?, ?)",
+                (job_id, fields.get('status'), json.dumps(fields), time.time())
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so concurrent workers cannot interleave
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                job = json.loads(row[0])
+                job.update(fields)
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, data = ?, updated_at = ? WHERE job_id = ?",
+                    (job.get('status'), json.dumps(job), time.time(), job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def list(self, status: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status is None:
+                rows = self._conn.execute(
+                    "SELECT job_id, data FROM jobs ORDER BY updated_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT job_id, data FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?",
+                    (status, limit)
+                ).fetchall()
+        return [dict(json.loads(data), job_id=job_id) for job_id, data in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def create_job_store(config: AppConfig) -> JobStore:
+    """Job store selected by AppConfig.job_store"""
+    if config.job_store == 'sqlite':
+        return SQLiteJobStore(config.job_db_path)
+    return MemoryJobStore()
+
+# ==============================================================================
+# RESULT CACHE
+# ==============================================================================
+
+class ResultCache:
+    """
+    Content-addressed index of finished outputs, LRU-evicted by total bytes
+
+    Keys combine the input's SHA-256, the effective hologram settings and the engine
+    version. Identical renders that are still running are shared via in-flight futures.
+    Eviction only forgets the entry: the output still belongs to its job and is removed
+    by the StorageJanitor. Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, Tuple[str, int]]' = OrderedDict()  # key -> (path, size)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(input_hash: str, kind: str, settings: Dict[str, Any]) -> str:
+        """Cache key for an input, its output kind ('image' or 'video') and settings"""
+        material = json.dumps({
+            'input': input_hash,
+            'kind': kind,
+            'settings': settings,
+            'engine': ENGINE_VERSION
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached output, refreshing its LRU position; None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None and not os.path.exists(entry[0]):
+            # Removed behind our back; forget it
+            self._drop(key)
+            entry = None
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, path: str):
+        """Record a finished output, forgetting least recently used entries over the bound"""
+        if not self.enabled:
+            return
+        if key in self._entries:
+            self._drop(key)
+        size = os.path.getsize(path)
+        self._entries[key] = (path, size)
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def discard_path(self, path: str):
+        """Forget the entry of an output deleted elsewhere"""
+        for key, (entry_path, _) in list(self._entries.items()):
+            if entry_path == path:
+                self._drop(key)
+
+    def inflight(self, key: str) -> Optional[asyncio.Future]:
+        """Future of a render of the same key that is still running"""
+        return self._inflight.get(key)
+
+    def begin(self, key: str) -> asyncio.Future:
+        """Register a render so identical jobs can wait for it"""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def finish(self, key: str, output_file: Optional[str] = None,
+               error: Optional[BaseException] = None):
+        """Resolve a render's future and cache its output"""
+        future = self._inflight.pop(key)
+        if error is not None:
+            future.set_exception(error)
+            future.exception()  # Waiters re-raise it; don't warn when there are none
+        else:
+            self.put(key, output_file)
+            future.set_result(output_file)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.shared + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'shared': self.shared,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.shared) / lookups, 4) if lookups else 0.0,
+            'inflight': len(self._inflight)
+        }
+
+# ==============================================================================
+# JOB QUEUE
 # ==============================================================================
 
+class JobQueue:
+    """
+    Admission control and per-type concurrency for render jobs
+
+    A job is admitted only while fewer than max_queued jobs are waiting and its estimated
+    memory fits the budget next to every job already admitted; otherwise the upload gets
+    429 with a Retry-After derived from recent job durations. Admitted jobs wait in FIFO
+    order for one of their type's slots. Used from the event loop only, so no locking
+    is needed.
+    """
+
+    # Assumed job duration in seconds until one of that type has finished
+    DEFAULT_DURATION = {'image': 2.0, 'video': 30.0, 'inline': 0.5}
+
+    def __init__(self, limits: Dict[str, int], max_queued: int, memory_budget: int):
+        self.limits = dict(limits)
+        self.max_queued = max_queued
+        self.memory_budget = memory_budget
+        self._waiting: Dict[str, 'OrderedDict[str, asyncio.Future]'] = {kind: OrderedDict() for kind in limits}
+        self._running: Dict[str, Dict[str, float]] = {kind: {} for kind in limits}  # job_id -> start time
+        self._kinds: Dict[str, str] = {}
+        self._reserved: Dict[str, int] = {}  # job_id -> estimated bytes
+        self._durations = dict(self.DEFAULT_DURATION)  # Moving average per type
+        self.reserved_bytes = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(len(waiting) for waiting in self._waiting.values())
+
+    def admit(self, job_id: str, kind: str, estimate: int):
+        """
+        Reserve a place for a job, raising HTTPException if it cannot be taken on
+
+        Raises:
+            HTTPException: 413 if the job alone exceeds the memory budget, 429 with a
+                Retry-After header if the queue is full or the memory is taken
+        """
+        self._check_budget(estimate)
+        if self.queued >= self.max_queued or self.reserved_bytes + estimate > self.memory_budget:
+            self._reject(kind)
+        self._enqueue(job_id, kind, estimate)
+
+    def try_start(self, job_id: str, kind: str, estimate: int):
+        """
+        Start a job right away, for requests that cannot wait in the queue; pair with release
+
+        Raises:
+            HTTPException: 413 if the job alone exceeds the memory budget, 429 with a
+                Retry-After header if every slot of its type is taken or the memory is
+        """
+        self._check_budget(estimate)
+        if len(self._running[kind]) + len(self._waiting[kind]) >= self.limits[kind] or \
+                self.reserved_bytes + estimate > self.memory_budget:
+            self._reject(kind)
+        self._enqueue(job_id, kind, estimate)
+
+    def _check_budget(self, estimate: int):
+        if estimate > self.memory_budget:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Job needs about {estimate // 2**20} MiB, over the "
+                       f"{self.memory_budget // 2**20} MiB budget; try a smaller file"
+            )
+
+    def _reject(self, kind: str):
+        self.rejected += 1
+        raise HTTPException(
+            status_code=429,
+            detail="Server busy, try again later",
+            headers={'Retry-After': str(self.retry_after(kind))}
+        )
+
+    def _enqueue(self, job_id: str, kind: str, estimate: int):
+        self._kinds[job_id] = kind
+        self._reserved[job_id] = estimate
+        self.reserved_bytes += estimate
+        self._waiting[kind][job_id] = asyncio.get_running_loop().create_future()
+        self._dispatch(kind)
+
+    async def acquire(self, job_id: str, kind: str):
+        """
+        Wait for a slot of the job's type
+
+        Jobs that skipped admission (expected cache hits that had to render after all)
+        are queued here without a memory reservation.
+        """
+        if job_id not in self._kinds:
+            self._enqueue(job_id, kind, 0)
+        future = self._waiting[kind].get(job_id)
+        if future is None:
+            return  # Already running
+        try:
+            await future
+        except asyncio.CancelledError:
+            self.release(job_id)
+            raise
+
+    def release(self, job_id: str):
+        """Free a job's slot and memory reservation, starting the next waiting job"""
+        kind = self._kinds.pop(job_id, None)
+        if kind is None:
+            return
+        self.reserved_bytes -= self._reserved.pop(job_id)
+        self._waiting[kind].pop(job_id, None)
+        started = self._running[kind].pop(job_id, None)
+        if started is not None:
+            self._durations[kind] = 0.8 * self._durations[kind] + 0.2 * (time.monotonic() - started)
+        self._dispatch(kind)
+
+    def _dispatch(self, kind: str):
+        waiting = self._waiting[kind]
+        while waiting and len(self._running[kind]) < self.limits[kind]:
+            job_id, future = waiting.popitem(last=False)
+            self._running[kind][job_id] = time.monotonic()
+            if not future.done():
+                future.set_result(None)
+
+    def admitted(self) -> set:
+        """job_ids of every admitted job that has not been released"""
+        return set(self._kinds)
+
+    def waiting(self, kind: str) -> List[str]:
+        """Waiting job_ids of a type, in queue order"""
+        return list(self._waiting[kind])
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place among waiting jobs of the same type, None unless waiting"""
+        kind = self._kinds.get(job_id)
+        if kind is None or job_id not in self._waiting[kind]:
+            return None
+        return list(self._waiting[kind]).index(job_id) + 1
+
+    def retry_after(self, kind: str) -> int:
+        """Seconds until the queue has likely drained by one job of this type"""
+        rounds = (len(self._waiting[kind]) + 1) / self.limits[kind]
+        return max(1, math.ceil(rounds * self._durations[kind]))
+
+    def stats(self) -> Dict[str, Any]:
+        """Running and waiting jobs per type, and reserved memory"""
+        return {
+            'jobs': {kind: {
+                'running': len(self._running[kind]),
+                'queued': len(self._waiting[kind]),
+                'limit': self.limits[kind],
+                'avg_seconds': round(self._durations[kind], 2)
+            } for kind in self.limits},
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'reserved_bytes': self.reserved_bytes,
+            'memory_budget': self.memory_budget,
+            'rejected': self.rejected
+        }
+
+# ==============================================================================
+# JOB EVENTS
+# ==============================================================================
+
+# Job states after which nothing more is published
+TERMINAL_STATUSES = ('completed', 'failed')
+
+class JobChannel:
+    """
+    Latest published state of one job, shared by all of its subscribers
+
+    The state is encoded to JSON once per push and every viewer sends the same text.
+    Waiters only ever see the newest state; updates in between coalesce.
+    """
+
+    def __init__(self):
+        self.message: Optional[str] = None
+        self.status: Optional[str] = None
+        self.version = 0
+        self.subscribers = 0
+        self.last_push = float('-inf')
+        self.pending: Optional[Dict[str, Any]] = None
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self._changed = asyncio.Event()
+
+    def push(self, state: Dict[str, Any], now: float):
+        """Make state the current message and wake every waiter, unless nothing changed"""
+        message = json.dumps(state)
+        if message == self.message:
+            return
+        self.message = message
+        self.status = state.get('status')
+        self.version += 1
+        self.last_push = now
+        # Waiters hold the old event; a fresh one is used for the next push
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """Wait for a state newer than version; False if timeout passed first"""
+        while self.version <= version:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+class JobEvents:
+    """
+    In-process pub/sub of job state changes, one channel per watched job
+
+    Publishing to a job nobody watches is a no-op. Pushes to a channel are throttled
+    to one per min_interval seconds; a terminal state is pushed immediately. Used from
+    the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._channels: Dict[str, JobChannel] = {}
+
+    def watched(self, job_id: str) -> bool:
+        return job_id in self._channels
+
+    def subscribe(self, job_id: str) -> JobChannel:
+        """Channel of a job, created on first use; pair with unsubscribe"""
+        channel = self._channels.get(job_id)
+        if channel is None:
+            channel = self._channels[job_id] = JobChannel()
+        channel.subscribers += 1
+        return channel
+
+    def unsubscribe(self, job_id: str):
+        """Drop one subscriber; the channel goes away with its last one"""
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return
+        channel.subscribers -= 1
+        if channel.subscribers <= 0:
+            if channel.flush_handle is not None:
+                channel.flush_handle.cancel()
+            del self._channels[job_id]
+
+    def publish(self, job_id: str, state: Dict[str, Any]):
+        """Announce a job's new state to its subscribers"""
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return
+        channel.pending = state
+
+        loop = asyncio.get_running_loop()
+        delay = channel.last_push + self.min_interval - loop.time()
+        if delay <= 0 or state.get('status') in TERMINAL_STATUSES:
+            self._flush(channel)
+        elif channel.flush_handle is None:
+            channel.flush_handle = loop.call_later(delay, self._flush, channel)
+
+    @staticmethod
+    def _flush(channel: JobChannel):
+        if channel.flush_handle is not None:
+            channel.flush_handle.cancel()
+            channel.flush_handle = None
+        if channel.pending is not None:
+            channel.push(channel.pending, asyncio.get_running_loop().time())
+            channel.pending = None
+
+    def stats(self) -> Dict[str, int]:
+        """Watched jobs and open subscriptions"""
+        return {
+            'channels': len(self._channels),
+            'subscribers': sum(channel.subscribers for channel in self._channels.values())
+        }
+
+# ==============================================================================
+# HOLOGRAM PROCESSOR (hologram_generator jobs in a worker pool)
+# ==============================================================================
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(partial(f.read, chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
 class HologramProcessor:
-    """Handles hologram generation using the existing 3DHologram.py"""
+    """Handles hologram generation in a bounded worker pool, off the event loop"""
 
     def __init__(self, config: AppConfig):
         self.config = config
-        self.processing_jobs: Dict[str, Dict[str, Any]] = {}
+        self.jobs: JobStore = create_job_store(config)
+        # Store calls are blocking (SQLite waits up to its busy timeout for another
+        # worker's write), so they run here, one at a time and in order, off the loop
+        self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-store')
+        self.cache = ResultCache(config.result_cache_max_bytes)
+        self.queue = JobQueue(config.max_concurrent_jobs, config.max_queued_jobs, config.memory_budget)
+        self.events = JobEvents(config.status_push_interval)
+        self.executor: Optional[Executor] = None
+        self.host = socket.gethostname()
+        self._manager = None
+        self._progress_queue = None
+        self._progress_relay: Optional[threading.Thread] = None
 
-    async def process_file(self, file_path: str, job_id: str) -> Dict[str, Any]:
-        """Process uploaded file and generate hologram"""
+    def start(self):
+        """Create the worker pool and the progress relay (idempotent; needs a running loop)"""
+        if self.executor is not None:
+            return
+
+        loop = asyncio.get_running_loop()
+        if self.config.worker_pool == 'process':
+            # Spawned workers do not inherit the server's threads, OpenCV state or encoder
+            # probe; each loads the probe from encoder_cache_path as it starts
+            context = multiprocessing.get_context('spawn')
+            self.executor = ProcessPoolExecutor(max_workers=self.config.max_workers, mp_context=context,
+                                                initializer=probe_encoders,
+                                                initargs=(self.config.encoder_cache_path,))
+            self._manager = context.Manager()
+            self._progress_queue = self._manager.Queue()
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.config.max_workers,
+                                               thread_name_prefix='hologram-worker')
+            self._progress_queue = queue.Queue()
+
+        def relay():
+            # Workers put (job_id, VideoProgress); apply them on the event loop
+            while True:
+                try:
+                    item = self._progress_queue.get()
+                except (EOFError, OSError):
+                    break  # Manager process went away
+                if item is None:
+                    break
+                asyncio.run_coroutine_threadsafe(self._update_progress(*item), loop)
+
+        self._progress_relay = threading.Thread(target=relay, name='hologram-progress', daemon=True)
+        self._progress_relay.start()
+        logger.info(f"Started {self.config.worker_pool} pool with {self.config.max_workers} workers")
+
+    async def run_store(self, method: Callable, *args) -> Any:
+        """Call a JobStore method on the store thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._store_executor, partial(method, *args))
+
+    async def close_store(self):
+        """Close the job store after the last job update"""
+        await self.run_store(self.jobs.close)
+        self._store_executor.shutdown()
+
+    def recover_orphans(self) -> int:
+        """
+        Fail queued and processing jobs whose server process is gone; returns their count
+
+        Jobs record the host and pid of the worker that accepted them. Without this, jobs
+        interrupted by a crash or restart would never finish and the StorageJanitor would
+        protect their files forever. Jobs of live workers, and of other hosts (whose
+        processes cannot be checked), are left alone. Call at startup, before this
+        worker accepts jobs, through run_store.
+        """
+        recovered = 0
+        for status in ('queued', 'processing'):
+            for job in self.jobs.list(status, limit=100000):
+                if self._owner_alive(job.get('owner')):
+                    continue
+                self.jobs.update(job['job_id'], {
+                    'status': 'failed',
+                    'error': "Interrupted by a server restart",
+                    'end_time': time.time()
+                })
+                recovered += 1
+        if recovered:
+            logger.warning(f"Marked {recovered} interrupted jobs as failed")
+        return recovered
+
+    def _owner(self) -> Dict[str, Any]:
+        return {'host': self.host, 'pid': os.getpid()}
+
+    def _owner_alive(self, owner: Optional[Dict[str, Any]]) -> bool:
+        if not owner:
+            return False  # Recorded before owners were
+        if owner.get('host') != self.host:
+            return True
+        pid = owner.get('pid')
+        if pid == os.getpid():
+            return False  # An earlier process that had this pid
+        if os.name == 'nt':
+            return True  # os.kill would terminate the process
         try:
-            self.processing_jobs[job_id] = {
-                'status': 'processing',
-                'progress': 0,
-                'start_time': time.time()
-            }
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass  # Exists, owned by another user
+        return True
 
-            # Determine output path
-            file_name = Path(file_path).stem
-            output_path = os.path.join(self.config.output_dir, f"hologram_{file_name}_{job_id}")
-
-            # Call the existing hologram generator
-            if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
-                # Process image
-                output_file = await self._process_image(file_path, output_path)
-            elif file_path.lower().endswith(('.avi', '.mp4')):
-                # Process video
-                output_file = await self._process_video(file_path, output_path)
+    def shutdown(self):
+        """Stop the worker pool and the progress relay"""
+        if self.executor is None:
+            return
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._progress_queue.put(None)
+        self._progress_relay.join(timeout=5)
+        if self._manager is not None:
+            self._manager.shutdown()
+        self.executor = self._manager = self._progress_queue = self._progress_relay = None
+
+    async def submit(self, file_path: str, job_id: str, input_hash: Optional[str] = None,
+                     options: Optional[HologramOptions] = None) -> Dict[str, Any]:
+        """
+        Admit an upload to the job queue and record it as queued, with its settings
+
+        Uploads whose output is cached or already rendering skip admission; all others
+        need room in the queue and the memory budget.
+
+        Raises:
+            HTTPException: 400 if the file cannot be read or the options cannot be met,
+                otherwise see JobQueue.admit
+        """
+        kind = self._job_kind(file_path)
+        job = {
+            'status': 'queued',
+            'kind': kind,
+            'progress': 0,
+            'queued_time': time.time(),
+            'owner': self._owner()
+        }
+        if input_hash:
+            job['input_sha256'] = input_hash
+
+        loop = asyncio.get_running_loop()
+        shape = await loop.run_in_executor(None, read_media_shape, file_path)
+        if shape is None:
+            raise HTTPException(status_code=400, detail="Could not read the uploaded image or video")
+        try:
+            job['settings'] = (options or HologramOptions()).resolve(
+                self.config.hologram_settings, shape, video=kind == 'video'
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        key = self.cache.key(input_hash, kind, job['settings']) \
+            if input_hash and self.cache.enabled else None
+        if key is None or (self.cache.get(key) is None and self.cache.inflight(key) is None):
+            job['memory_estimate'] = estimate_job_memory(shape, job['settings'], video=kind == 'video')
+            self.queue.admit(job_id, kind, job['memory_estimate'])
+
+        await self.run_store(self.jobs.create, job_id, job)
+        return job
+
+    async def process_file(self, file_path: str, job_id: str,
+                           input_hash: Optional[str] = None) -> Dict[str, Any]:
+        """Process uploaded file and generate hologram"""
+        job = await self.run_store(self.jobs.get, job_id)
+        if job is None:
+            # Not submitted; render with the default settings, without admission control
+            job = {'status': 'queued', 'progress': 0, 'queued_time': time.time(), 'owner': self._owner()}
+            if input_hash:
+                job['input_sha256'] = input_hash
+            await self.run_store(self.jobs.create, job_id, job)
+        settings = job.get('settings') or self.config.hologram_settings
+
+        try:
+            kind = self._job_kind(file_path)
+            if input_hash and self.cache.enabled:
+                output_file = await self._render_cached(file_path, job_id, input_hash, kind, settings)
             else:
-                raise ValueError(f"Unsupported file type: {file_path}")
+                output_file = await self._render(file_path, job_id, kind, settings)
 
-            self.processing_jobs[job_id].update({
+            # The content hash is the download's strong ETag
+            loop = asyncio.get_running_loop()
+            output_hash = await loop.run_in_executor(None, file_sha256, output_file)
+
+            return await self._update_job(job_id, {
                 'status': 'completed',
                 'progress': 100,
                 'output_file': output_file,
+                'output_sha256': output_hash,
                 'end_time': time.time()
             })
 
-            return self.processing_jobs[job_id]
-
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
-            self.processing_jobs[job_id].update({
+            await self._update_job(job_id, {
                 'status': 'failed',
                 'error': str(e),
                 'end_time': time.time()
             })
             raise
 
-    async def _process_image(self, input_path: str, output_path: str) -> str:
-        """Process image file using 3DHologram.py logic"""
-        # Import the hologram generation function
-        import sys
-        sys.path.append('.')
+        finally:
+            self.queue.release(job_id)
 
-        try:
-            # Read image
-            orig = cv2.imread(input_path)
-            if orig is None:
-                raise ValueError(f"Could not read image: {input_path}")
+    @staticmethod
+    def _job_kind(file_path: str) -> str:
+        """'image' or 'video' for a supported upload"""
+        if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
+            return 'image'
+        if file_path.lower().endswith(('.avi', '.mp4')):
+            return 'video'
+        raise ValueError(f"Unsupported file type: {file_path}")
 
-            # Generate hologram using the same logic as 3DHologram.py
-            from hologram_generator import makeHologram  # We'll create this wrapper
+    async def _render_cached(self, file_path: str, job_id: str, input_hash: str, kind: str,
+                             settings: Dict[str, Any]) -> str:
+        """Serve a job from the result cache, join an identical running render, or render it"""
+        key = self.cache.key(input_hash, kind, settings)
 
-            holo = makeHologram(orig, **self.config.hologram_settings)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.hits += 1
+            await self._update_job(job_id, {'cache': 'hit'})
+            return cached
 
-            # Save output
-            output_file = f"{output_path}.png"
-            cv2.imwrite(output_file, holo)
+        inflight = self.cache.inflight(key)
+        if inflight is not None:
+            self.cache.shared += 1
+            await self._update_job(job_id, {'cache': 'shared'})
+            # Shield so one cancelled waiter does not cancel the shared render
+            return await asyncio.shield(inflight)
 
-            return output_file
+        # Registered before the first await, so identical jobs arriving meanwhile share it
+        self.cache.misses += 1
+        self.cache.begin(key)
+        try:
+            await self._update_job(job_id, {'cache': 'miss'})
+            output_file = await self._render(file_path, job_id, kind, settings)
+        except BaseException as e:
+            self.cache.finish(key, error=e)
+            raise
+        self.cache.finish(key, output_file)
+        return output_file
 
-        except ImportError:
-            # Fallback: call 3DHologram.py as subprocess
-            output_file = f"{output_path}.png"
-            result = await asyncio.create_subprocess_exec(
-                'python', '3DHologram.py', input_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            await result.wait()
+    async def _render(self, file_path: str, job_id: str, kind: str, settings: Dict[str, Any]) -> str:
+        """Render a job and publish its output in output_dir"""
+        # Each job renders in its own work directory, so concurrent jobs never share a
+        # file name and a half-written result is never visible under /outputs
+        work_dir = os.path.join(self.config.output_dir, f".work_{job_id}")
+
+        await self.queue.acquire(job_id, kind)
+        await self._update_job(job_id, {'status': 'processing', 'start_time': time.time()})
+        # Every job behind this one moved up a place
+        for waiting_id in self.queue.waiting(kind):
+            if self.events.watched(waiting_id):
+                status = await self.get_job_status(waiting_id)
+                if status is not None:
+                    self.events.publish(waiting_id, status)
 
-            if result.returncode != 0:
-                stderr = await result.stderr.read()
-                raise RuntimeError(f"Hologram generation failed: {stderr.decode()}")
+        try:
+            self.start()
+            os.makedirs(work_dir, exist_ok=True)
 
-            # The 3DHologram.py saves as hologram.png, we need to rename it
-            default_output = "hologram.png"
-            if os.path.exists(default_output):
-                os.rename(default_output, output_file)
+            # Uploads are stored as "<job_id>_<original name>"
+            file_name = Path(file_path).stem
+            if file_name.startswith(f"{job_id}_"):
+                file_name = file_name[len(job_id) + 1:]
+            output_name = f"hologram_{file_name}_{job_id}"
 
+            if kind == 'image':
+                rendered = await self._process_image(file_path, os.path.join(work_dir, output_name), settings)
+            else:
+                rendered = await self._process_video(file_path, os.path.join(work_dir, output_name),
+                                                     job_id, settings)
+
+            # Publish under the name the encoder actually produced (e.g. .avi after a codec fallback)
+            output_file = os.path.join(self.config.output_dir, os.path.basename(rendered))
+            os.replace(rendered, output_file)
             return output_file
 
-    async def _process_video(self, input_path: str, output_path: str) -> str:
-        """Process video file using 3DHologram.py logic"""
-        # Similar to image processing but for videos
-        output_file = f"{output_path}.mp4"
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
 
-        # Call 3DHologram.py as subprocess for video processing
-        result = await asyncio.create_subprocess_exec(
-            'python', '3DHologram.py', input_path,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+    async def _process_image(self, input_path: str, output_path: str, settings: Dict[str, Any]) -> str:
+        """Create an image hologram in the worker pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, render_image_file,
+            input_path, f"{output_path}.png", settings
         )
-        await result.wait()
 
-        if result.returncode != 0:
-            stderr = await result.stderr.read()
-            raise RuntimeError(f"Video hologram generation failed: {stderr.decode()}")
+    async def _process_video(self, input_path: str, output_path: str, job_id: str,
+                             settings: Dict[str, Any]) -> str:
+        """Create a video hologram in the worker pool, reporting live progress"""
+        loop = asyncio.get_running_loop()
+        summary = await loop.run_in_executor(self.executor, partial(
+            render_video_file, input_path, f"{output_path}.mp4", settings,
+            progress_queue=self._progress_queue, tag=job_id,
+            dedup_threshold=0.0, progress_interval=self.config.progress_interval
+        ))
 
-        # Rename the default output
-        default_output = "hologram_output.mp4"
-        if os.path.exists(default_output):
-            os.rename(default_output, output_file)
-        elif os.path.exists("hologram.avi"):
-            # Sometimes it creates .avi
-            os.rename("hologram.avi", output_file)
+        await self._update_job(job_id, {
+            'frames_done': summary.frames,
+            'duplicate_frames': summary.duplicate_frames,
+            'dedup_hit_rate': round(summary.hit_rate, 4)
+        })
+        return summary.output_file
 
-        return output_file
+    async def render_inline(self, data: bytes, image_format: str, quality: Optional[int] = None) -> bytes:
+        """
+        Create an image hologram in memory in the worker pool, without waiting in the job queue
+
+        Inline renders take one of the 'inline' slots and reserve their memory next to
+        queued jobs, so a burst cannot pile up in the pool ahead of admitted jobs.
+
+        Raises:
+            HTTPException: see JobQueue.try_start
+        """
+        self.start()
+        # Unreadable headers fail in the render; reserve for the largest accepted image
+        side = math.isqrt(self.config.inline_max_pixels)
+        shape = image_bytes_shape(data) or (side, side)
+        estimate = estimate_job_memory(shape + (3,), self.config.hologram_settings)
+
+        job_id = str(uuid.uuid4())
+        self.queue.try_start(job_id, 'inline', estimate)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, partial(
+                render_image_bytes, data, image_format, self.config.hologram_settings,
+                quality=quality, max_pixels=self.config.inline_max_pixels
+            ))
+        finally:
+            self.queue.release(job_id)
+
+    async def _update_progress(self, job_id: str, progress: VideoProgress):
+        """Record live video progress on a job that is still processing"""
+        fields = {
+            'frames_done': progress.frames_done,
+            'total_frames': progress.total_frames,
+            'fps': round(progress.fps, 2),
+            'eta_seconds': round(progress.eta, 1) if progress.eta is not None else None
+        }
+        if progress.percent is not None:
+            # 100 is reserved for the completed job
+            fields['progress'] = min(99, int(progress.percent))
+
+        def merge() -> Optional[Dict[str, Any]]:
+            # Checked on the store thread, so a late update never overwrites the final state
+            job = self.jobs.get(job_id)
+            if job is None or job.get('status') != 'processing':
+                return None
+            return self.jobs.update(job_id, fields)
+
+        self._publish(job_id, await self.run_store(merge))
+
+    async def _update_job(self, job_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merge fields into a job and publish its new state to WebSocket subscribers"""
+        job = await self.run_store(self.jobs.update, job_id, fields)
+        self._publish(job_id, job)
+        return job
+
+    def _publish(self, job_id: str, job: Optional[Dict[str, Any]]):
+        if job is not None and self.events.watched(job_id):
+            self.events.publish(job_id, self._with_queue_position(job_id, job))
+
+    def _with_queue_position(self, job_id: str, job: Dict[str, Any]) -> Dict[str, Any]:
+        if job.get('status') == 'queued':
+            job['queue_position'] = self.queue.position(job_id)
+        return job
+
+    async def output_hash(self, job_id: str, job: Dict[str, Any]) -> str:
+        """SHA-256 of a completed job's output, hashed once for jobs recorded without it"""
+        if not job.get('output_sha256'):
+            loop = asyncio.get_running_loop()
+            job['output_sha256'] = await loop.run_in_executor(None, file_sha256, job['output_file'])
+            await self.run_store(self.jobs.update, job_id, {'output_sha256': job['output_sha256']})
+        return job['output_sha256']
+
+    async def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get processing job status, with its place in the queue while waiting"""
+        job = await self.run_store(self.jobs.get, job_id)
+        return self._with_queue_position(job_id, job) if job is not None else None
+
+# ==============================================================================
+# STORAGE JANITOR
+# ==============================================================================
+
+# Uploads, outputs and work directories all carry their job_id
+_JOB_ID_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}')
+
+class StorageJanitor:
+    """
+    Periodic retention sweep over upload_dir and output_dir
+
+    A file's last use is its access time, which /download sets explicitly, so the LRU
+    order survives restarts and does not depend on atime mount options. Files of jobs
+    that are queued or processing, and very recent files, are never deleted.
+    """
+
+    # Files younger than this are skipped, covering uploads admitted during a sweep
+    MIN_AGE = 60.0
+
+    def __init__(self, config: AppConfig, processor: 'HologramProcessor'):
+        self.config = config
+        self.processor = processor
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.evicted: Dict[str, int] = {'ttl': 0, 'quota': 0}
+        self.reclaimed_bytes = 0
+        self.stored_bytes = 0
+        self.protected_files = 0
+        self.last_run: Optional[float] = None
+
+    def start(self):
+        """Run sweeps every janitor_interval seconds (needs a running loop)"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.config.janitor_interval)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Storage sweep failed: {e}")
+
+    async def _active_job_ids(self) -> set:
+        # The queue knows this worker's jobs, the store those of every worker
+        active = self.processor.queue.admitted()
+        for status in ('queued', 'processing'):
+            jobs = await self.processor.run_store(self.processor.jobs.list, status, 100000)
+            active.update(job['job_id'] for job in jobs)
+        return active
 
-    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get processing job status"""
-        return self.processing_jobs.get(job_id)
+    async def sweep(self) -> Dict[str, Any]:
+        """Apply the TTL and the quota once; returns stats()"""
+        active = await self._active_job_ids()
+        loop = asyncio.get_running_loop()
+        removed = await loop.run_in_executor(None, self._sweep_files, active, time.time())
+        for path in removed:
+            self.processor.cache.discard_path(path)
+        self.runs += 1
+        self.last_run = time.time()
+        return self.stats()
+
+    def _sweep_files(self, active: set, now: float) -> List[str]:
+        """Delete expired files, then least recently used ones over the quota (blocking)"""
+        candidates = []  # (last used, size, path, is_dir)
+        total = 0
+        protected = 0
+        for directory in (self.config.upload_dir, self.config.output_dir):
+            for entry in os.scandir(directory):
+                is_dir = entry.is_dir(follow_symlinks=False)
+                if is_dir:
+                    # Only work directories left behind by a crash are ours to remove
+                    if not entry.name.startswith('.work_'):
+                        continue
+                elif entry.name.startswith('.') or not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                if is_dir:
+                    # Listing the directory sets its atime, and nothing downloads it: mtime only
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path) if f.is_file())
+                    last_used = stat.st_mtime
+                else:
+                    size = stat.st_size
+                    last_used = max(stat.st_atime, stat.st_mtime)
+                match = _JOB_ID_PATTERN.search(entry.name)
+                total += size
+                if (match and match.group(0) in active) or now - stat.st_mtime < self.MIN_AGE:
+                    protected += 1
+                    continue
+                candidates.append((last_used, size, entry.path, is_dir))
+
+        candidates.sort()
+        removed = []
+        ttl = self.config.retention_seconds
+        quota = self.config.storage_quota_bytes
+        for last_used, size, path, is_dir in candidates:
+            if ttl > 0 and now - last_used > ttl:
+                reason = 'ttl'
+            elif quota > 0 and total > quota:
+                reason = 'quota'
+            else:
+                continue
+            try:
+                if is_dir:
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not delete {path}: {e}")
+                continue
+            total -= size
+            self.evicted[reason] += 1
+            self.reclaimed_bytes += size
+            removed.append(path)
+
+        self.stored_bytes = total
+        self.protected_files = protected
+        if removed:
+            logger.info(f"Storage sweep removed {len(removed)} files, {total} bytes remain")
+        return removed
+
+    @staticmethod
+    def touch(path: str):
+        """Mark a file as just used"""
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except OSError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Eviction counters and the size found by the last sweep"""
+        return {
+            'runs': self.runs,
+            'last_run': self.last_run,
+            'evicted': dict(self.evicted),
+            'reclaimed_bytes': self.reclaimed_bytes,
+            'stored_bytes': self.stored_bytes,
+            'protected_files': self.protected_files,
+            'quota_bytes': self.config.storage_quota_bytes,
+            'retention_seconds': self.config.retention_seconds
+        }
+
+# ==============================================================================
+# LIVE HOLOGRAM STREAM (holomind_bisa HolographicRenderer)
+# ==============================================================================
+
+def load_holomind_core():
+    """
+    holomind_bisa.holomind_core, or None if it or its AI/speech dependencies are missing
+
+    The import is slow (it pulls in the AI and speech packages), so call it off the
+    event loop; see LiveHologramStream.load.
+    """
+    try:
+        from holomind_bisa import holomind_core
+    except Exception as e:  # ImportError, or a dependency failing while it loads
+        logger.warning(f"Live hologram stream unavailable: {e}")
+        return None
+    return holomind_core
+
+@dataclass
+class DisplayAgent:
+    """
+    The agent state HolographicRenderer reads, without AgentCore's AI and speech backends
+
+    A headless render node only drives displays, so it needs no API key, microphone
+    or TTS engine. visual_params defaults match AgentCore's.
+    """
+    current_state: Any
+    emotional_tone: Any
+    energy_level: float = 0.5
+    visual_params: Dict[str, Any] = field(default_factory=lambda: {
+        'core_size': 0.3,
+        'particle_count': 100,
+        'wave_frequency': 1.0,
+        'rotation_speed': 0.5,
+        'glow_intensity': 0.8,
+        'tendril_count': 6
+    })
+
+@dataclass(frozen=True)
+class LiveFrame:
+    """One encoded projection, shared by every viewer"""
+    seq: int
+    jpeg: bytes
+    part: bytes  # The JPEG framed as a multipart/x-mixed-replace part
+
+class LiveHologramStream:
+    """
+    Renders HolographicRenderer projections while anyone watches, encoding each once
+
+    A render thread produces JPEG frames at up to live_fps and every viewer, MJPEG or
+    WebSocket, sends the same bytes. Viewers always take the newest frame, so a slow
+    client skips frames instead of queueing them. Rendering stops with the last viewer.
+    holomind_core is imported once by load(), at startup; until then the stream is
+    'loading', and it stays 'unavailable' if the import fails.
+    """
+
+    BOUNDARY = 'frame'
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.state = 'loading'  # Then 'available' or 'unavailable'
+        self._core = None
+        self.renderer = None
+        self.frame: Optional[LiveFrame] = None
+        self.viewers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._stop: Optional[threading.Event] = None
+        self._render_lock = threading.Lock()
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.render_ms = 0.0  # Moving averages
+        self.encode_ms = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self._core is not None
+
+    async def load(self):
+        """Import holomind_core in a thread, so the event loop keeps serving meanwhile"""
+        loop = asyncio.get_running_loop()
+        self._core = await loop.run_in_executor(None, load_holomind_core)
+        self.state = 'available' if self._core is not None else 'unavailable'
+
+    def subscribe(self):
+        """Add a viewer, starting the renderer if needed (needs a running loop and load())"""
+        if self.renderer is None:
+            agent = DisplayAgent(self._core.AgentState.IDLE, self._core.EmotionalTone.NEUTRAL)
+            self.renderer = self._core.HolographicRenderer(agent)
+        if self._changed is None:
+            self._loop = asyncio.get_running_loop()
+            self._changed = asyncio.Event()
+
+        self.viewers += 1
+        if self._stop is None:
+            # Each run has its own stop event, so a run still winding down never resumes
+            self._stop = threading.Event()
+            threading.Thread(target=self._render_loop, args=(self._stop,),
+                             name='hologram-live', daemon=True).start()
+            logger.info("Live hologram stream started")
+
+    def unsubscribe(self):
+        """Remove a viewer, stopping the renderer with the last one"""
+        self.viewers -= 1
+        if self.viewers <= 0 and self._stop is not None:
+            self._stop.set()
+            self._stop = None
+            self.frame = None  # New viewers should not start on a stale frame
+            logger.info("Live hologram stream stopped")
+
+    def shutdown(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+
+    def _render_loop(self, stop: threading.Event):
+        size = self.config.live_render_size
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.config.live_jpeg_quality]
+        interval = 1.0 / self.config.live_fps
+        next_time = time.monotonic()
+
+        while not stop.is_set():
+            try:
+                with self._render_lock:
+                    started = time.perf_counter()
+                    frame = self.renderer.render_frame(size, size)
+                    projection = self.renderer.generate_hologram_projection(frame)
+                    rendered = time.perf_counter()
+                    ok, jpeg = cv2.imencode('.jpg', projection, params)
+                    encoded = time.perf_counter()
+                if ok:
+                    self.render_ms = 0.9 * self.render_ms + 0.1 * (rendered - started) * 1000
+                    self.encode_ms = 0.9 * self.encode_ms + 0.1 * (encoded - rendered) * 1000
+                    self._loop.call_soon_threadsafe(self._publish, jpeg.tobytes())
+            except Exception as e:
+                logger.error(f"Live hologram render failed: {e}")
+                stop.wait(1.0)
+
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay > 0:
+                stop.wait(delay)
+            else:
+                next_time = time.monotonic()  # Fell behind; don't burst to catch up
+
+    def _publish(self, jpeg: bytes):
+        if self.viewers <= 0:
+            return
+        seq = self.frame.seq + 1 if self.frame is not None else 1
+        header = (f"--{self.BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                  f"Content-Length: {len(jpeg)}\r\n\r\n").encode()
+        self.frame = LiveFrame(seq, jpeg, header + jpeg + b"\r\n")
+        self.frames_rendered += 1
+        # Waiters hold the old event; a fresh one is used for the next frame
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def next_frame(self, last_seq: int = 0) -> LiveFrame:
+        """The newest frame after last_seq, counting any skipped in between as dropped"""
+        while self.frame is None or self.frame.seq <= last_seq:
+            await self._changed.wait()
+        frame = self.frame
+        if last_seq and frame.seq > last_seq + 1:
+            self.frames_dropped += frame.seq - last_seq - 1
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        """Viewers, frame counters and per-frame cost"""
+        return {
+            'available': self.available,
+            'state': self.state,
+            'viewers': self.viewers,
+            'frames_rendered': self.frames_rendered,
+            'frames_dropped': self.frames_dropped,
+            'render_ms': round(self.render_ms, 2),
+            'encode_ms': round(self.encode_ms, 2),
+            'fps_limit': self.config.live_fps
+        }
 
 # ==============================================================================
 # VOICE AGENT INTEGRATION
@@ -210,15 +1489,35 @@ class VoiceAgentManager:
 # FASTAPI APPLICATION
 # ==============================================================================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown hooks"""
+    # Probe video encoders once, off the event loop, so jobs pick one immediately
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, probe_encoders, config.encoder_cache_path)
+    await hologram_processor.run_store(hologram_processor.recover_orphans)
+    hologram_processor.start()
+    storage_janitor.start()
+    live_loader = asyncio.create_task(live_stream.load())
+    yield
+    live_loader.cancel()
+    await storage_janitor.stop()
+    live_stream.shutdown()
+    hologram_processor.shutdown()
+    await hologram_processor.close_store()
+
 app = FastAPI(
     title="HoloVoice - Holographic Voice Assistant",
     description="Web app integrating ElevenLabs voice agent with hologram generation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Initialize components
 config = AppConfig()
 hologram_processor = HologramProcessor(config)
+storage_janitor = StorageJanitor(config, hologram_processor)
+live_stream = LiveHologramStream(config)
 voice_manager = VoiceAgentManager(config)
 
 # Mount static files
@@ -232,6 +1531,162 @@ templates = Jinja2Templates(directory="templates")
 # API ENDPOINTS
 # ==============================================================================
 
+# Allowance for multipart boundaries and part headers on top of the file itself
+UPLOAD_OVERHEAD = 64 * 1024
+
+# Media types of the formats /hologram can return
+IMAGE_MEDIA_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'webp': 'image/webp'}
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared size is over the limit before any body is read"""
+    limits = {
+        "/upload": (config.max_file_size, config.max_file_size + UPLOAD_OVERHEAD),
+        "/hologram": (config.inline_max_file_size, config.inline_max_file_size)
+    }
+    if request.url.path in limits:
+        max_size, max_body = limits[request.url.path]
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Max size: {max_size} bytes"}
+            )
+    return await call_next(request)
+
+@dataclass
+class ReceivedUpload:
+    """A multipart upload saved by receive_upload"""
+    filename: str  # Base name sent by the client
+    path: str
+    size: int
+    sha256: str
+    fields: Dict[str, str]  # The other form fields, as text
+
+async def receive_upload(request: Request, upload_dir: str, prefix: str, max_size: int,
+                         allowed_extensions: List[str],
+                         chunk_size: int = 1024 * 1024) -> ReceivedUpload:
+    """
+    Parse a multipart/form-data body straight from the request stream
+
+    The "file" part is hashed and written to upload_dir as "<prefix>_<name>" while it
+    arrives, so it is never spooled to a temporary file first and memory use stays
+    around chunk_size. Other parts are kept as text fields. 413 is raised as soon as
+    the file passes max_size or the whole body passes max_size + UPLOAD_OVERHEAD,
+    and the partial file is removed.
+
+    Raises:
+        HTTPException: 400 for a malformed body, a missing file or a disallowed
+            extension, 413 when over the size limits
+    """
+    content_type, params = multipart.multipart.parse_options_header(request.headers.get('content-type', ''))
+    boundary = params.get(b'boundary')
+    if content_type != b'multipart/form-data' or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+
+    too_large = HTTPException(status_code=413, detail=f"File too large. Max size: {max_size} bytes")
+
+    # The parser reports through synchronous callbacks; events are collected per network
+    # chunk and handled afterwards, so file writes can be awaited
+    events: List[Tuple[str, Any]] = []
+    header: Dict[str, bytearray] = {'field': bytearray(), 'value': bytearray()}
+    headers: Dict[bytes, bytes] = {}
+
+    def on_header_end():
+        headers[bytes(header['field']).lower()] = bytes(header['value'])
+        header['field'].clear()
+        header['value'].clear()
+
+    def on_headers_finished():
+        events.append(('headers', dict(headers)))
+        headers.clear()
+
+    parser = multipart.MultipartParser(boundary, {
+        'on_header_field': lambda data, start, end: header['field'].extend(data[start:end]),
+        'on_header_value': lambda data, start, end: header['value'].extend(data[start:end]),
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': lambda data, start, end: events.append(('data', data[start:end])),
+        'on_part_end': lambda: events.append(('end', None))
+    })
+
+    upload: Optional[ReceivedUpload] = None
+    fields: Dict[str, str] = {}
+    hasher = hashlib.sha256()
+    out = None  # Open file while the file part is arriving
+    pending = bytearray()  # File bytes not yet written, flushed every chunk_size
+    field_name: Optional[str] = None
+    field_value = bytearray()
+    received = 0
+
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_size + UPLOAD_OVERHEAD:
+                raise too_large
+            parser.write(chunk)
+
+            for event, value in events:
+                if event == 'headers':
+                    disposition = value.get(b'content-disposition', b'')
+                    _, options = multipart.multipart.parse_options_header(disposition)
+                    name = options.get(b'name', b'').decode('utf-8', 'replace')
+                    if name != 'file':
+                        field_name = name
+                        continue
+                    if upload is not None:
+                        raise HTTPException(status_code=400, detail="Only one file can be uploaded")
+                    # Only the base name is kept, so a crafted filename cannot leave upload_dir
+                    filename = Path(options.get(b'filename', b'').decode('utf-8', 'replace')).name
+                    if not filename:
+                        raise HTTPException(status_code=400, detail="No file provided")
+                    if Path(filename).suffix.lower() not in allowed_extensions:
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File type not allowed. Allowed: {allowed_extensions}"
+                        )
+                    upload = ReceivedUpload(filename, os.path.join(upload_dir, f"{prefix}_{filename}"),
+                                            0, '', fields)
+                    out = await aiofiles.open(upload.path, 'wb')
+                elif event == 'data':
+                    if out is None:
+                        field_value.extend(value)
+                        continue
+                    upload.size += len(value)
+                    if upload.size > max_size:
+                        raise too_large
+                    hasher.update(value)
+                    pending.extend(value)
+                    if len(pending) >= chunk_size:
+                        await out.write(bytes(pending))
+                        pending.clear()
+                else:  # End of a part
+                    if out is not None:
+                        await out.write(bytes(pending))
+                        await out.close()
+                        out = None
+                    elif field_name is not None:
+                        fields[field_name] = field_value.decode('utf-8', 'replace')
+                    field_name = None
+                    field_value.clear()
+            events.clear()
+
+        parser.finalize()
+        if upload is None:
+            raise HTTPException(status_code=400, detail="No file provided")
+        if out is not None:
+            raise HTTPException(status_code=400, detail="Upload ended in the middle of the file")
+
+    except BaseException:
+        if out is not None:
+            await out.close()
+        if upload is not None and os.path.exists(upload.path):
+            os.remove(upload.path)
+        raise
+
+    upload.sha256 = hasher.hexdigest()
+    return upload
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Main web interface"""
@@ -241,51 +1696,83 @@ async def home(request: Request):
     })
 
 @app.post("/upload")
-async def upload_file(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...)
-) -> Dict[str, Any]:
-    """Upload and process file for hologram generation"""
-
-    # Validate file
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="No file provided")
-
-    file_ext = Path(file.filename).suffix.lower()
-    if file_ext not in config.allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type not allowed. Allowed: {config.allowed_extensions}"
-        )
+async def upload_file(request: Request, background_tasks: BackgroundTasks) -> Dict[str, Any]:
+    """
+    Upload and process file for hologram generation, with optional per-job settings
 
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > config.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Max size: {config.max_file_size} bytes"
-        )
-
-    # Save uploaded file
+    Multipart form with a "file" part and optional scale, scaleR, distance, max_pixels
+    and target_resolution fields. The body is parsed as it streams in (see receive_upload).
+    """
+    # Save uploaded file, enforcing the size limit while streaming
     job_id = str(uuid.uuid4())
-    upload_path = os.path.join(config.upload_dir, f"{job_id}_{file.filename}")
+    upload = await receive_upload(request, config.upload_dir, job_id, config.max_file_size,
+                                  config.allowed_extensions, config.upload_chunk_size)
+    upload_path, size, input_hash = upload.path, upload.size, upload.sha256
 
-    with open(upload_path, "wb") as f:
-        f.write(file_content)
+    # Refused uploads (bad settings, queue full, over the memory budget) are not kept
+    try:
+        try:
+            options = HologramOptions.parse(upload.fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        job = await hologram_processor.submit(upload_path, job_id, input_hash, options)
+    except BaseException:
+        os.remove(upload_path)
+        raise
 
-    # Start background processing
-    background_tasks.add_task(hologram_processor.process_file, upload_path, job_id)
+    # Start background processing; it waits for a slot of its job type
+    background_tasks.add_task(hologram_processor.process_file, upload_path, job_id, input_hash)
 
     return {
         "job_id": job_id,
-        "message": "File uploaded and processing started",
-        "status_url": f"/status/{job_id}"
+        "message": "File uploaded and queued for processing",
+        "status_url": f"/status/{job_id}",
+        "queue_position": hologram_processor.queue.position(job_id),
+        "settings": job['settings'],
+        "size": size,
+        "sha256": input_hash
     }
 
+@app.post("/hologram")
+async def create_hologram(request: Request, image_format: str = Query('png', alias='format'),
+                          quality: Optional[int] = None) -> Response:
+    """
+    Create an image hologram and return it in the response
+
+    The request body is the image itself (not multipart). It is decoded, composed and
+    encoded in memory without touching disk. Only images within inline_max_file_size
+    and inline_max_pixels are accepted; larger ones go through /upload and the job queue.
+    """
+    if image_format not in IMAGE_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(IMAGE_MEDIA_TYPES)}")
+    if quality is not None and not 1 <= quality <= 100:
+        raise HTTPException(status_code=400, detail="quality must be between 1 and 100")
+
+    # Read at most the cap even when no Content-Length was sent
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > config.inline_max_file_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File too large. Max size: {config.inline_max_file_size} bytes"
+            )
+    if not body:
+        raise HTTPException(status_code=400, detail="No image provided")
+
+    try:
+        hologram = await hologram_processor.render_inline(bytes(body), image_format, quality)
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=f"{e}; use /upload for large images")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=hologram, media_type=IMAGE_MEDIA_TYPES[image_format])
+
 @app.get("/status/{job_id}")
 async def get_job_status(job_id: str) -> Dict[str, Any]:
     """Get processing status for a job"""
-    status = hologram_processor.get_job_status(job_id)
+    status = await hologram_processor.get_job_status(job_id)
     if not status:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -293,29 +1780,135 @@ async def get_job_status(job_id: str) -> Dict[str, Any]:
 
 @app.websocket("/ws/{job_id}")
 async def websocket_endpoint(websocket: WebSocket, job_id: str):
-    """WebSocket for real-time status updates"""
+    """
+    WebSocket for real-time status updates
+
+    Pushes the job's state whenever it changes (at most every status_push_interval
+    seconds) instead of polling; all viewers of a job share one channel. Nothing is
+    sent while the state is unchanged, so the socket is also read: a disconnect ends
+    the handler and its subscription right away, even for a quiet or unknown job.
+    """
     await websocket.accept()
+    events = hologram_processor.events
+    channel = events.subscribe(job_id)
 
-    try:
+    async def push():
+        version = 0
         while True:
-            status = hologram_processor.get_job_status(job_id)
-            if status:
-                await websocket.send_json(status)
-
-                if status.get('status') in ['completed', 'failed']:
-                    break
+            if channel.version > version:
+                version = channel.version
+                await websocket.send_text(channel.message)
+                if channel.status in TERMINAL_STATUSES:
+                    return
+            elif channel.message is None or \
+                    not await channel.wait(version, config.status_refresh_interval):
+                # First viewer, or quiet for a while: read the store in case another
+                # worker changed the job (an unchanged state is not pushed again)
+                status = await hologram_processor.get_job_status(job_id)
+                if status:
+                    events.publish(job_id, status)
+                elif channel.message is None:
+                    await channel.wait(version, config.status_refresh_interval)  # Unknown job
 
-            await asyncio.sleep(1)  # Update every second
+    async def receive():
+        # Clients send nothing meaningful; wait for the disconnect
+        while (await websocket.receive())['type'] != 'websocket.disconnect':
+            pass
 
+    tasks = [asyncio.create_task(push()), asyncio.create_task(receive())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()  # Re-raise a failed send
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        await websocket.close()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        events.unsubscribe(job_id)
+        if websocket.application_state == WebSocketState.CONNECTED and \
+                websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close()
+
+def content_disposition(filename: str, inline: bool = False) -> str:
+    """
+    Attachment (or inline) header for any filename
 
-@app.get("/download/{job_id}")
-async def download_result(job_id: str):
-    """Download processed hologram"""
-    status = hologram_processor.get_job_status(job_id)
+    Headers must be Latin-1, so the name is sent RFC 5987 encoded as filename*, with an
+    ASCII filename= fallback (other characters replaced, quotes escaped) for old clients.
+    """
+    fallback = ''.join(c if ' ' <= c <= '~' else '_' for c in filename)
+    fallback = fallback.replace('\\', '\\\\').replace('"', '\\"')
+    disposition = f'{"inline" if inline else "attachment"}; filename="{fallback}"'
+    if fallback != filename:
+        disposition += f"; filename*=utf-8''{quote(filename, safe='')}"
+    return disposition
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match / If-Range style list contains etag"""
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if weak and candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    First and last byte of a single "bytes=" range
+
+    Returns None for headers that are ignored (malformed, other units or several
+    ranges), so the whole file is sent.
+
+    Raises:
+        HTTPException: 416 if the range lies outside the file
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable",
+                            headers={'Content-Range': f"bytes */{size}"})
+    return start, end
+
+async def read_file_range(path: str, start: int, end: int, chunk_size: int):
+    """Yield bytes start..end (inclusive) of a file in chunks"""
+    async with aiofiles.open(path, 'rb') as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+@app.api_route("/download/{job_id}", methods=["GET", "HEAD"])
+async def download_result(job_id: str, request: Request, inline: bool = False):
+    """
+    Download processed hologram
+
+    Supports single byte ranges (206) for seeking in videos. The strong ETag is the
+    output's SHA-256: If-None-Match answers 304, and If-Range only honours a range
+    while the ETag still matches. With inline=true the file is meant for display
+    (<video>, <img>) rather than saving.
+    """
+    status = await hologram_processor.get_job_status(job_id)
     if not status or status.get('status') != 'completed':
         raise HTTPException(status_code=404, detail="Result not ready or job failed")
 
@@ -323,12 +1916,123 @@ async def download_result(job_id: str):
     if not output_file or not os.path.exists(output_file):
         raise HTTPException(status_code=404, detail="Output file not found")
 
-    return FileResponse(
-        output_file,
-        media_type='application/octet-stream',
-        filename=os.path.basename(output_file)
+    etag = f'"{await hologram_processor.output_hash(job_id, status)}"'
+    storage_janitor.touch(output_file)  # Keeps recently downloaded outputs through quota sweeps
+    size = os.path.getsize(output_file)
+    headers = {
+        'ETag': etag,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': config.download_cache_control,
+        'Content-Disposition': content_disposition(os.path.basename(output_file), inline)
+    }
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    start, end = 0, size - 1
+    status_code = 200
+    range_header = request.headers.get('range')
+    if_range = request.headers.get('if-range')
+    # If-Range needs a strong match; a date or stale ETag means "send it all"
+    if range_header and size and (not if_range or etag_matches(if_range, etag, weak=False)):
+        byte_range = parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+
+    headers['Content-Length'] = str(end - start + 1 if size else 0)
+    media_type = mimetypes.guess_type(output_file)[0] or 'application/octet-stream'
+    if request.method == 'HEAD':
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        read_file_range(output_file, start, end, config.download_chunk_size),
+        status_code=status_code, headers=headers, media_type=media_type
     )
 
+LIVE_UNAVAILABLE = "Live hologram stream unavailable: holomind_bisa or its dependencies are not installed"
+LIVE_LOADING = "Live hologram stream is still loading, try again shortly"
+
+def live_unavailable_reason() -> str:
+    """Why the live stream cannot be watched right now"""
+    return LIVE_LOADING if live_stream.state == 'loading' else LIVE_UNAVAILABLE
+
+@app.get("/live/mjpeg")
+async def live_mjpeg():
+    """Live hologram projection as an MJPEG stream (usable directly in an <img> tag)"""
+    if not live_stream.available:
+        raise HTTPException(status_code=503, detail=live_unavailable_reason())
+
+    async def parts():
+        live_stream.subscribe()
+        try:
+            seq = 0
+            while True:
+                frame = await live_stream.next_frame(seq)
+                seq = frame.seq
+                yield frame.part
+        finally:
+            live_stream.unsubscribe()
+
+    return StreamingResponse(
+        parts(),
+        media_type=f"multipart/x-mixed-replace; boundary={LiveHologramStream.BOUNDARY}",
+        headers={'Cache-Control': 'no-store'}
+    )
+
+@app.websocket("/live/ws")
+async def live_websocket(websocket: WebSocket):
+    """Live hologram projection as binary WebSocket messages, one JPEG each"""
+    if not live_stream.available:
+        await websocket.close(code=1013, reason=live_unavailable_reason())  # Try again later
+        return
+
+    await websocket.accept()
+    live_stream.subscribe()
+    try:
+        seq = 0
+        while True:
+            frame = await live_stream.next_frame(seq)
+            seq = frame.seq
+            await websocket.send_bytes(frame.jpeg)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Live WebSocket error: {e}")
+    finally:
+        live_stream.unsubscribe()
+
+@app.get("/live/stats")
+async def get_live_stats() -> Dict[str, Any]:
+    """Live stream viewers and frame counters"""
+    return live_stream.stats()
+
+@app.get("/cache/stats")
+async def get_cache_stats() -> Dict[str, Any]:
+    """Result cache size and hit/miss counters"""
+    return hologram_processor.cache.stats()
+
+@app.get("/queue/stats")
+async def get_queue_stats() -> Dict[str, Any]:
+    """Running and waiting jobs per type, and reserved memory"""
+    return hologram_processor.queue.stats()
+
+@app.get("/events/stats")
+async def get_event_stats() -> Dict[str, int]:
+    """Jobs watched over WebSocket and open subscriptions"""
+    return hologram_processor.events.stats()
+
+@app.get("/storage/stats")
+async def get_storage_stats() -> Dict[str, Any]:
+    """Janitor eviction counters and stored bytes"""
+    return storage_janitor.stats()
+
+@app.get("/encoders")
+async def get_encoders() -> Dict[str, Any]:
+    """Video encoders probed on this host"""
+    return probe_encoders(config.encoder_cache_path).to_dict()
+
 # ==============================================================================
 # MAIN ENTRY POINT
 # ==============================================================================